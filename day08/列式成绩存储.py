@@ -0,0 +1,177 @@
+import numpy as np  # 需安装numpy
+
+from 智能学生管理系统 import SUBJECTS, TOP_THRESHOLD, classes
+
+# --------------------------
+
+# 列式成绩存储
+
+# --------------------------
+
+
+class ColumnarScores:
+    """列式成绩表：学号、班级下标各一列，成绩为 学生数×科目数 的浮点矩阵"""
+
+    def __init__(self, class_names, subjects=SUBJECTS, capacity=1024):
+        self.class_names = list(class_names)
+        self.subjects = list(subjects)
+        self.size = 0
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.class_index = np.empty(capacity, dtype=np.int32)
+        self.scores = np.empty((capacity, len(self.subjects)), dtype=np.float64)
+        self.names = []  # 姓名只在导出时使用，保留为普通列表
+        self._row_of = {}  # id -> 行号
+
+    # ---------- 导入导出 ----------
+
+    @classmethod
+    def from_classes(cls, classes, subjects=SUBJECTS):
+        """从现有的 classes 嵌套结构构建列式表"""
+        rows = [(i, s) for i, c in enumerate(classes) for s in c["students"]]
+        table = cls([c["name"] for c in classes], subjects, max(len(rows), 1))
+        if not rows:  # 空名册：空列表无法赋给 (0, 科目数) 的切片
+            return table
+        table.size = len(rows)
+        table.ids[: table.size] = [s["id"] for _, s in rows]
+        table.class_index[: table.size] = [i for i, _ in rows]
+        table.scores[: table.size] = [
+            [s["scores"][sub] for sub in table.subjects] for _, s in rows
+        ]
+        table.names = [s["name"] for _, s in rows]
+        table._row_of = {s["id"]: row for row, (_, s) in enumerate(rows)}
+        return table
+
+    def to_classes(self):
+        """导出为 classes 嵌套结构，方便旧代码继续使用"""
+        result = [{"name": name, "students": []} for name in self.class_names]
+        for row in range(self.size):
+            result[self.class_index[row]]["students"].append(self._student(row))
+        return result
+
+    def _student(self, row):
+        return {
+            "id": int(self.ids[row]),
+            "name": self.names[row],
+            "scores": {
+                sub: _plain(value)
+                for sub, value in zip(self.subjects, self.scores[row])
+            },
+        }
+
+    # ---------- 增改查 ----------
+
+    def _grow(self):
+        capacity = len(self.ids) * 2
+        self.ids = np.resize(self.ids, capacity)
+        self.class_index = np.resize(self.class_index, capacity)
+        self.scores = np.resize(self.scores, (capacity, len(self.subjects)))
+
+    def add_student(self, class_index, student_data):
+        """追加一名学生（容量不足时成倍扩容，均摊O(1)）"""
+        if student_data["id"] in self._row_of:
+            raise ValueError(f"学生ID重复：{student_data['id']}")
+        if self.size == len(self.ids):
+            self._grow()
+        row = self.size
+        self.ids[row] = student_data["id"]
+        self.class_index[row] = class_index
+        self.scores[row] = [student_data["scores"][sub] for sub in self.subjects]
+        self.names.append(student_data["name"])
+        self._row_of[student_data["id"]] = row
+        self.size += 1
+
+    def find_student(self, student_id):
+        row = self._row_of.get(student_id)
+        return None if row is None else self._student(row)
+
+    def update_score(self, student_id, subject, value):
+        self.scores[self._row_of[student_id], self.subjects.index(subject)] = value
+
+    # ---------- 向量化分析 ----------
+
+    def analyze_scores(self, threshold=TOP_THRESHOLD, percentiles=(25, 50, 75)):
+        """全年级成绩分析（平均分、分位数、分班统计、优秀学生筛选）"""
+        scores = self.scores[: self.size]
+        class_index = self.class_index[: self.size]
+        if self.size == 0:
+            return {
+                "averages": dict.fromkeys(self.subjects, 0.0),
+                "percentiles": {p: dict.fromkeys(self.subjects) for p in percentiles},
+                "class_averages": {},  # 与非空时一致：只列出有学生的班级
+                "top_students": [],
+            }
+
+        averages = scores.mean(axis=0)
+        quantiles = np.percentile(scores, percentiles, axis=0)
+
+        # 分班统计：按班级下标累加各科总分与人数
+        counts = np.bincount(class_index, minlength=len(self.class_names))
+        sums = np.zeros((len(self.class_names), len(self.subjects)))
+        np.add.at(sums, class_index, scores)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            class_averages = sums / counts[:, None]
+
+        # 优秀学生：个人平均分≥threshold
+        top_rows = np.flatnonzero(scores.mean(axis=1) >= threshold)
+
+        return {
+            "averages": self._by_subject(averages),
+            "percentiles": {
+                p: self._by_subject(row) for p, row in zip(percentiles, quantiles)
+            },
+            "class_averages": {
+                name: self._by_subject(row)
+                for name, row, count in zip(self.class_names, class_averages, counts)
+                if count
+            },
+            "top_students": [self._student(row) for row in top_rows],
+        }
+
+    def _by_subject(self, values):
+        return {sub: round(float(v), 1) for sub, v in zip(self.subjects, values)}
+
+
+def _plain(value):
+    """整数成绩导出时还原为int，与原数据保持一致"""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+# --------------------------
+
+# 主程序交互
+
+# --------------------------
+
+if __name__ == "__main__":
+    # 空名册也能建表，分析结果与非空时键相同
+    empty = ColumnarScores.from_classes([{"name": "空班", "students": []}])
+    assert empty.size == 0 and empty.to_classes() == [{"name": "空班", "students": []}]
+    assert empty.analyze_scores().keys() == {"averages", "percentiles", "class_averages", "top_students"}
+
+    table = ColumnarScores.from_classes(classes)
+
+    # 模拟载入大量成绩
+    rng = np.random.default_rng(0)
+    for i in range(10000):
+        table.add_student(
+            int(rng.integers(len(classes))),
+            {
+                "id": 100000 + i,
+                "name": f"外门弟子{i}",
+                "scores": dict(zip(SUBJECTS, rng.integers(60, 101, len(SUBJECTS)))),
+            },
+        )
+
+    report = table.analyze_scores()
+
+    print("=== 全年级成绩分析（列式存储） ===")
+    print(f"各科平均分：{report['averages']}")
+    print(f"中位数：{report['percentiles'][50]}")
+    for name, averages in report["class_averages"].items():
+        print(f"{name}：{averages}")
+    print(f"优秀学生人数：{len(report['top_students'])}")
+
+    # 导出回原有结构
+    exported = table.to_classes()
+    print(f"导出班级数：{len(exported)}，学生数：{sum(len(c['students']) for c in exported)}")
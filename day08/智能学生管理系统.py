@@ -1,9 +1,20 @@
+import csv
+import json
+import os
+import time
+from bisect import bisect_left, bisect_right, insort
+from pathlib import Path
+
 # --------------------------
 
 # 系统初始化数据
 
 # --------------------------
 
+SUBJECTS = ["炼丹术", "御剑术", "阵法"]  # 科目列表
+TOP_THRESHOLD = 90  # 优秀学生平均分线
+DATA_DIR = "student_data"  # 持久化目录（快照 + 变更日志）
+
 classes = [
     {  # 班级1
         "name": "筑基一班",
@@ -39,46 +50,447 @@ classes = [
 # --------------------------
 
 
+class StudentRegistry:
+    """学生注册表：持有classes数据，并维护ID与姓名的哈希索引"""
+
+    def __init__(self, classes):
+        self.classes = classes
+        self._by_id = {}  # id -> (班级下标, 班内位置)
+        self._ids_by_name = {}  # 姓名 -> {id, ...}
+
+        # 成绩聚合（随增删改增量维护）
+        self._subject_sums = dict.fromkeys(SUBJECTS, 0)  # 各科总分
+        self._subject_counts = dict.fromkeys(SUBJECTS, 0)  # 各科人数
+        self._averages = {}  # id -> 个人平均分
+        self._ranking = []  # 按平均分降序排列的 (-平均分, id)
+        self._ranking_dirty = True  # 批量导入（含下面的已有学生）后延迟到下次查询时再排序
+        self.journal = None  # 变更记录回调，由StudentStore挂载
+
+        for class_index, c in enumerate(classes):
+            for position, student in enumerate(c["students"]):
+                self._index(class_index, position, student)
+                self._add_scores(student)
+
+    def _index(self, class_index, position, student):
+        if student["id"] in self._by_id:
+            raise ValueError(f"学生ID重复：{student['id']}")
+        self._by_id[student["id"]] = (class_index, position)
+        self._ids_by_name.setdefault(student["name"], set()).add(student["id"])
+
+    def _add_scores(self, student):
+        scores = student["scores"]
+        for sub, value in scores.items():
+            self._subject_sums[sub] = self._subject_sums.get(sub, 0) + value
+            self._subject_counts[sub] = self._subject_counts.get(sub, 0) + 1
+        average = sum(scores.values()) / len(SUBJECTS)
+        self._averages[student["id"]] = average
+        if self._ranking_dirty:
+            self._ranking.append((-average, student["id"]))
+        else:
+            insort(self._ranking, (-average, student["id"]))
+
+    def _remove_scores(self, student):
+        for sub, value in student["scores"].items():
+            self._subject_sums[sub] -= value
+            self._subject_counts[sub] -= 1
+        average = self._averages.pop(student["id"])
+        self._sort_ranking()
+        del self._ranking[bisect_left(self._ranking, (-average, student["id"]))]
+
+    def _detach(self, student_id):
+        """从班级列表中取出学生（与末尾元素交换后弹出，O(1)）"""
+        class_index, position = self._by_id.pop(student_id)
+        students = self.classes[class_index]["students"]
+        student = students[position]
+        last = students.pop()
+        if last is not student:
+            students[position] = last
+            self._by_id[last["id"]] = (class_index, position)
+        ids = self._ids_by_name[student["name"]]
+        ids.discard(student_id)
+        if not ids:
+            del self._ids_by_name[student["name"]]
+        return student
+
+    def add_student(self, class_index, student_data):
+        """添加学生到指定班级，同时更新两个索引"""
+        students = self.classes[class_index]["students"]
+        self._index(class_index, len(students), student_data)
+        students.append(student_data)
+        self._add_scores(student_data)
+        if self.journal:
+            self.journal({"op": "add", "class": class_index, "student": student_data})
+
+    def add_students(self, class_index, batch):
+        """批量添加学生：排行榜先追加，等到下次查询时再统一排序
+
+        整批先查重，有重复ID时整批都不添加。
+        """
+        students = self.classes[class_index]["students"]
+        batch_ids = set()
+        for student in batch:
+            if student["id"] in self._by_id or student["id"] in batch_ids:
+                raise ValueError(f"学生ID重复：{student['id']}")
+            batch_ids.add(student["id"])
+        self._ranking_dirty = True  # _add_scores只追加，不逐个插入
+        for student in batch:
+            self._index(class_index, len(students), student)
+            students.append(student)
+            self._add_scores(student)
+        if self.journal:
+            self.journal({"op": "add_many", "class": class_index, "students": batch})
+
+    def _sort_ranking(self):
+        if self._ranking_dirty:
+            self._ranking.sort()
+            self._ranking_dirty = False
+
+    def find(self, student_id):
+        """通过ID查找学生，O(1)"""
+        slot = self._by_id.get(student_id)
+        if slot is None:
+            return None
+        class_index, position = slot
+        return self.classes[class_index]["students"][position]
+
+    def find_many(self, student_ids):
+        """批量查找（报名名单等场景），找不到的返回None"""
+        return [self.find(student_id) for student_id in student_ids]
+
+    def find_by_name(self, name):
+        """通过姓名查找所有同名学生"""
+        return [self.find(i) for i in self._ids_by_name.get(name, ())]
+
+    def class_of(self, student_id):
+        """返回学生所在班级下标"""
+        return self._by_id[student_id][0]
+
+    def move_student(self, student_id, class_index):
+        """把学生转到另一个班级，O(1)"""
+        students = self.classes[class_index]["students"]  # 先确认目标班级存在，再取出学生
+        student = self._detach(student_id)
+        self._index(class_index, len(students), student)
+        students.append(student)
+        if self.journal:
+            self.journal({"op": "move", "id": student_id, "class": class_index})
+        return student
+
+    def remove_student(self, student_id):
+        """删除学生（班内顺序不保证不变）"""
+        student = self._detach(student_id)
+        self._remove_scores(student)
+        if self.journal:
+            self.journal({"op": "remove", "id": student_id})
+        return student
+
+    def update_score(self, student_id, subject, value):
+        """修改单科成绩，同步刷新聚合数据（成绩请统一通过此方法修改）"""
+        student = self.find(student_id)
+        if student is None:
+            raise KeyError(f"学生ID不存在：{student_id}")
+        if subject not in SUBJECTS:
+            raise KeyError(f"科目不存在：{subject}")
+        self._remove_scores(student)
+        student["scores"][subject] = value
+        self._add_scores(student)
+        if self.journal:
+            self.journal(
+                {"op": "score", "id": student_id, "subject": subject, "value": value}
+            )
+
+    def apply(self, record):
+        """重放一条变更记录"""
+        op = record["op"]
+        if op == "add":
+            self.add_student(record["class"], record["student"])
+        elif op == "add_many":
+            self.add_students(record["class"], record["students"])
+        elif op == "move":
+            self.move_student(record["id"], record["class"])
+        elif op == "remove":
+            self.remove_student(record["id"])
+        elif op == "score":
+            self.update_score(record["id"], record["subject"], record["value"])
+        else:
+            raise ValueError(f"未知的变更类型：{op}")
+
+    def subject_averages(self):
+        """各科平均分，O(科目数)"""
+        return {
+            sub: round(self._subject_sums[sub] / count, 1) if count else 0.0
+            for sub, count in self._subject_counts.items()
+        }
+
+    def average_of(self, student_id):
+        """个人平均分"""
+        return self._averages[student_id]
+
+    def top_n(self, n):
+        """平均分最高的n名学生"""
+        self._sort_ranking()
+        return [self.find(i) for _, i in self._ranking[:n]]
+
+    def students_above(self, threshold=TOP_THRESHOLD):
+        """平均分≥threshold的学生（按平均分降序），无需全表扫描"""
+        self._sort_ranking()
+        end = bisect_right(self._ranking, (-threshold, float("inf")))
+        return [self.find(i) for _, i in self._ranking[:end]]
+
+    def __len__(self):
+        return len(self._by_id)
+
+
+registry = StudentRegistry(classes)
+
+
+# --------------------------
+
+# 持久化存储
+
+# --------------------------
+
+
+class StudentStore:
+    """学生数据持久化：追加式变更日志 + 定期压缩的快照
+
+    每次修改只往 changes.log 追加一行；累计compact_every条后把当前数据
+    写成 snapshot.json 并清空日志。启动时读取快照，只重放快照之后的日志。
+    """
+
+    def __init__(self, data_dir=DATA_DIR, compact_every=10000):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.snapshot_path = self.data_dir / "snapshot.json"
+        self.log_path = self.data_dir / "changes.log"
+        self.compact_every = compact_every
+        self.registry = None
+        self.seq = 0  # 最后一条变更的序号
+        self._pending = 0  # 上次快照之后追加的记录数
+        self._log = None
+
+    def load(self, seed_classes):
+        """恢复数据：没有快照时以seed_classes为初始数据"""
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+        else:
+            snapshot = {"seq": 0, "classes": seed_classes}
+        self.seq = snapshot["seq"]
+        self.registry = StudentRegistry(snapshot["classes"])
+
+        # 重放快照之后的日志；进程中途退出可能留下半行，截掉即可
+        good_bytes = 0
+        unterminated = False
+        if self.log_path.exists():
+            with open(self.log_path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    good_bytes += len(line)
+                    if record["seq"] > self.seq:
+                        self.registry.apply(record)
+                        self.seq = record["seq"]
+                        self._pending += 1
+                    unterminated = not line.endswith(b"\n")
+            os.truncate(self.log_path, good_bytes)
+            if good_bytes and unterminated:
+                # 最后一条完整但缺换行：补上，免得下一条记录接在同一行
+                with open(self.log_path, "ab") as f:
+                    f.write(b"\n")
+
+        self._log = open(self.log_path, "a", encoding="utf-8")
+        self.registry.journal = self.append
+        return self.registry
+
+    def append(self, record):
+        """追加一条变更记录"""
+        self.seq += 1
+        record = {"seq": self.seq, **record}
+        self._log.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._log.flush()
+        self._pending += 1
+        if self._pending >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """写入新快照（先写临时文件再原子替换），然后清空日志"""
+        tmp_path = self.snapshot_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"seq": self.seq, "classes": self.registry.classes},
+                f,
+                ensure_ascii=False,
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        # 快照已带上seq，即使清空日志前进程退出，重放时也会跳过旧记录
+        self._log.close()
+        self._log = open(self.log_path, "w", encoding="utf-8")
+        self._pending = 0
+
+    def close(self):
+        if self._log:
+            self._log.close()
+            self._log = None
+        if self.registry:
+            self.registry.journal = None
+
+
+def open_store(data_dir=DATA_DIR, compact_every=10000):
+    """从磁盘恢复学生数据，之后的修改都会记录到变更日志"""
+
+    global classes, registry
+
+    store = StudentStore(data_dir, compact_every)
+    registry = store.load(classes)
+    classes = registry.classes
+    return store
+
+
 def add_student(class_index, student_data):
     """添加学生到指定班级"""
 
-    classes[class_index]["students"].append(student_data)
+    registry.add_student(class_index, student_data)
 
 
 def find_student(student_id):
-    """通过ID查找学生（返回第一个匹配项）"""
+    """通过ID查找学生（找不到返回None）"""
+
+    return registry.find(student_id)
 
-    return next(
-        (s for c in classes for s in c["students"] if s["id"] == student_id), None
-    )
+
+def update_score(student_id, subject, value):
+    """修改学生单科成绩"""
+
+    registry.update_score(student_id, subject, value)
 
 
 def analyze_scores():
-    """全年级成绩分析"""
-
-    # 使用lambda计算各科平均分
-
-    subjects = ["炼丹术", "御剑术", "阵法"]
-    total_students = sum(1 for c in classes for s in c["students"])
-    averages = {
-        sub: round(sum(
-            s["scores"][sub]
-            for c in classes
-            for s in c["students"]
-        ) / total_students, 1)
-        for sub in subjects
+    """全年级成绩分析（直接读取增量维护的聚合数据）"""
+
+    return {
+        "averages": registry.subject_averages(),
+        "top_students": registry.students_above(TOP_THRESHOLD),
     }
 
-    # 使用lambda筛选优秀学生（平均分≥90）
 
-    top_students = [
-        s
-        for c in classes
-        for s in c["students"]
-        if (lambda scores: sum(scores.values()) / 3 >= 90)(s["scores"])
-    ]
+# --------------------------
 
-    return {"averages": averages, "top_students": top_students}
+# 批量导入
+
+# --------------------------
+
+
+def _read_rows(path):
+    """逐行读取CSV或JSON Lines文件，产出 (行号, 原始记录)"""
+
+    path = Path(path)
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            # CSV列：id,name,炼丹术,御剑术,阵法
+            for line_no, row in enumerate(csv.DictReader(f), 2):
+                yield line_no, {
+                    "id": row.get("id"),
+                    "name": row.get("name"),
+                    "scores": {sub: row.get(sub) for sub in SUBJECTS},
+                }
+        else:
+            for line_no, line in enumerate(f, 1):
+                if line.strip():
+                    yield line_no, line  # JSON在校验时再解析，坏行不影响后续行
+
+
+def _parse_id(value):
+    """学号只接受整数（JSON）或纯数字字符串（CSV），小数、布尔值等一律拒绝"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().isdecimal():
+        return int(value)
+    raise ValueError(f"学号必须为整数：{value!r}")
+
+
+def _validate_row(raw):
+    """校验一行记录是否符合 {"id","name","scores"} 结构，返回规范化后的学生数据"""
+
+    if isinstance(raw, str):
+        raw = json.loads(raw)
+    if not isinstance(raw, dict) or set(raw) != {"id", "name", "scores"}:
+        raise ValueError("字段必须为 id/name/scores")
+    name = raw["name"]
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("姓名不能为空")
+    scores = raw["scores"]
+    if not isinstance(scores, dict) or set(scores) != set(SUBJECTS):
+        raise ValueError(f"成绩科目必须为 {SUBJECTS}")
+    student = {
+        "id": _parse_id(raw["id"]),
+        "name": name.strip(),
+        "scores": {sub: float(scores[sub]) for sub in SUBJECTS},
+    }
+    for sub, value in student["scores"].items():
+        if not 0 <= value <= 100:
+            raise ValueError(f"{sub}成绩超出范围：{value}")
+        if value.is_integer():
+            student["scores"][sub] = int(value)
+    return student
+
+
+def import_students(path, class_index, chunk_size=1000, max_errors=100):
+    """流式导入名单到指定班级
+
+    文件按行读取，每凑满chunk_size条有效记录就批量写入一次，
+    内存占用与文件大小无关。被拒绝的行只保留前max_errors条原因。
+    """
+
+    started = time.perf_counter()
+    imported = rejected = 0
+    errors = []
+    batch = []
+    batch_ids = set()
+
+    def reject(line_no, reason):
+        nonlocal rejected
+        rejected += 1
+        if len(errors) < max_errors:
+            errors.append((line_no, reason))
+
+    def flush():
+        nonlocal imported
+        registry.add_students(class_index, batch)
+        imported += len(batch)
+        batch.clear()
+        batch_ids.clear()
+
+    for line_no, raw in _read_rows(path):
+        try:
+            student = _validate_row(raw)
+        except (ValueError, TypeError) as e:
+            reject(line_no, str(e))
+            continue
+        if student["id"] in batch_ids or registry.find(student["id"]) is not None:
+            reject(line_no, f"学生ID重复：{student['id']}")
+            continue
+
+        batch.append(student)
+        batch_ids.add(student["id"])
+        if len(batch) >= chunk_size:
+            flush()
+
+    if batch:
+        flush()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "imported": imported,
+        "rejected": rejected,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round((imported + rejected) / elapsed) if elapsed else 0,
+    }
 
 
 # --------------------------
@@ -89,6 +501,10 @@ def analyze_scores():
 
 if __name__ == "__main__":
 
+    # 从磁盘恢复数据（首次运行以上面的初始数据建库）
+
+    store = open_store()
+
     # 添加新学生
 
     new_student = {
@@ -97,7 +513,8 @@ if __name__ == "__main__":
         "scores": {"炼丹术": 96, "御剑术": 85, "阵法": 90},
     }
 
-    add_student(1, new_student)  # 添加到金丹二班
+    if find_student(new_student["id"]) is None:
+        add_student(1, new_student)  # 添加到金丹二班
 
     # 查询学生信息
 
@@ -114,3 +531,5 @@ if __name__ == "__main__":
     print(f"各科平均分：{report['averages']}")
 
     print(f"优秀学生名单：{[s['name'] for s in report['top_students']]}")
+
+    store.close()
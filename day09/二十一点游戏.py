@@ -1,9 +1,15 @@
+import json
 import random
+from array import array
+from functools import lru_cache
+from pathlib import Path
 
 # =====================
 # 全局配置
 # =====================
 INITIAL_CHIPS = 1000  # 初始筹码
+PENETRATION = 0.75  # 发牌深度：发完75%的牌后重新洗牌
+DEALER_TABLE_PATH = Path(__file__).with_name("dealer_outcomes.json")  # 庄家结局概率缓存
 # 全局常量
 SUITS = ["♥", "♦", "♠", "♣"]  # 花色
 RANKS = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]  # 点数
@@ -22,6 +28,7 @@ CARD_VALUES = {
     "Q": 10,
     "K": 10,
 }
+CARDS = [(suit, rank) for suit in SUITS for rank in RANKS]  # 52张牌，牌靴里只存下标
 
 
 # =====================
@@ -34,8 +41,69 @@ def create_deck(num_decks=6):
     return deck
 
 
+class Shoe:
+    """牌靴：整靴只洗一次，按游标顺序发牌，发到切牌位置后才重新洗牌"""
+
+    def __init__(self, num_decks=6, penetration=PENETRATION):
+        self.cards = array("B", range(len(CARDS))) * num_decks  # 紧凑的牌下标数组
+        self.cut_card = int(len(self.cards) * penetration)  # 切牌位置
+        self.shuffle()
+
+    def shuffle(self):
+        random.shuffle(self.cards)
+        self.cursor = 0
+
+    def needs_shuffle(self):
+        """是否已发过切牌（每局开始前检查，当前这局照常打完）"""
+        return self.cursor >= self.cut_card
+
+    def pop(self):
+        """发一张牌（与list.pop用法相同，可直接传给player_turn/dealer_turn）"""
+        if self.cursor >= len(self.cards):
+            self.shuffle()
+        card = CARDS[self.cards[self.cursor]]
+        self.cursor += 1
+        return card
+
+    def __len__(self):
+        return len(self.cards) - self.cursor
+
+
+class Hand(list):
+    """手牌：每次append时增量累计硬点数（A按1计）与A的张数，计分无需重算整手
+
+    只支持append追加牌，其他修改列表的方法不会更新累计值。
+    """
+
+    def __init__(self, cards=()):
+        super().__init__()
+        self.hard = 0  # A按1计的总点数
+        self.aces = 0  # A的张数
+        for card in cards:
+            self.append(card)
+
+    def append(self, card):
+        super().append(card)
+        if card[1] == "A":
+            self.aces += 1
+            self.hard += 1
+        else:
+            self.hard += CARD_VALUES[card[1]]
+
+    @property
+    def is_soft(self):
+        """是否有一张A正按11计"""
+        return self.aces > 0 and self.hard <= 11
+
+    @property
+    def score(self):
+        return self.hard + 10 if self.is_soft else self.hard
+
+
 def calculate_score(hand):
     """计算手牌最优点数（自动处理A的1/11值）"""
+    if isinstance(hand, Hand):
+        return hand.score
     score = sum(CARD_VALUES[card[1]] for card in hand)
     aces = sum(1 for card in hand if card[1] == "A")
 
@@ -57,11 +125,119 @@ def show_cards(hand, hide_first=False):
     return "  ".join(display)
 
 
+# =====================
+# 概率表（无限副牌近似）
+# =====================
+# 每次发牌各点数值出现的概率：10/J/Q/K都是10点
+CARD_PROBS = {
+    value: sum(1 for rank in RANKS if CARD_VALUES[rank] == value) / len(RANKS)
+    for value in set(CARD_VALUES.values())
+}
+DEALER_OUTCOMES = [17, 18, 19, 20, 21, "bust"]  # 庄家最终结局
+
+
+def _add_card(score, soft, value):
+    """在(最优点数, 是否软牌)状态上再加一张牌，爆牌返回None"""
+    if value == 11:
+        if score + 11 <= 21:
+            return score + 11, True
+        value = 1
+    score += value
+    if score > 21 and soft:
+        return score - 10, False
+    if score > 21:
+        return None
+    return score, soft
+
+
+@lru_cache(maxsize=None)
+def _dealer_distribution(score, soft):
+    """庄家从该状态开始按17点以下要牌，返回各结局概率（与DEALER_OUTCOMES对应）"""
+    if score >= 17:
+        return tuple(1.0 if outcome == score else 0.0 for outcome in DEALER_OUTCOMES)
+    result = [0.0] * len(DEALER_OUTCOMES)
+    for value, prob in CARD_PROBS.items():
+        state = _add_card(score, soft, value)
+        if state is None:
+            result[-1] += prob
+        else:
+            for i, p in enumerate(_dealer_distribution(*state)):
+                result[i] += prob * p
+    return tuple(result)
+
+
+@lru_cache(maxsize=None)
+def dealer_outcome_table():
+    """{庄家明牌点数: 各结局概率}，首次计算后缓存到磁盘"""
+    if DEALER_TABLE_PATH.exists():
+        with open(DEALER_TABLE_PATH, encoding="utf-8") as f:
+            return {int(up): probs for up, probs in json.load(f).items()}
+
+    table = {
+        up: list(_dealer_distribution(*_add_card(0, False, up)))
+        for up in sorted(CARD_PROBS)
+    }
+    with open(DEALER_TABLE_PATH, "w", encoding="utf-8") as f:
+        json.dump(table, f)
+    return table
+
+
+def _stand_ev(score, dealer_up):
+    """停牌期望收益（赢+1、输-1、平0）"""
+    ev = 0.0
+    for outcome, prob in zip(DEALER_OUTCOMES, dealer_outcome_table()[dealer_up]):
+        if outcome == "bust" or outcome < score:
+            ev += prob
+        elif outcome > score:
+            ev -= prob
+    return ev
+
+
+@lru_cache(maxsize=None)
+def _best_ev(score, soft, dealer_up):
+    """返回 (最佳操作, 期望收益)，21点及以上与原游戏一样自动停牌"""
+    stand = _stand_ev(score, dealer_up)
+    if score >= 21:
+        return "s", stand
+    hit = 0.0
+    for value, prob in CARD_PROBS.items():
+        state = _add_card(score, soft, value)
+        hit += prob * (-1.0 if state is None else _best_ev(*state, dealer_up)[1])
+    return ("h", hit) if hit > stand else ("s", stand)
+
+
+@lru_cache(maxsize=None)
+def strategy_table():
+    """基本策略表 {(点数, 是否软牌, 庄家明牌): (操作, 期望收益)}"""
+    return {
+        (score, soft, up): _best_ev(score, soft, up)
+        for up in sorted(CARD_PROBS)
+        for soft in (False, True)
+        for score in range(12 if soft else 4, 22)
+    }
+
+
+def best_action(hand, dealer_up_card):
+    """查表给出建议：'h'要牌 / 's'停牌"""
+    hand = hand if isinstance(hand, Hand) else Hand(hand)
+    up = CARD_VALUES[dealer_up_card[1]]
+    return strategy_table()[hand.score, hand.is_soft, up][0]
+
+
+def expected_value(hand, dealer_up_card):
+    """查表给出当前手牌按最佳策略继续打的期望收益"""
+    hand = hand if isinstance(hand, Hand) else Hand(hand)
+    up = CARD_VALUES[dealer_up_card[1]]
+    if hand.score > 21:
+        return -1.0
+    return strategy_table()[hand.score, hand.is_soft, up][1]
+
+
 # =====================
 # 游戏流程控制
 # =====================
-def player_turn(deck, player_hand):
-    """玩家操作回合"""
+def player_turn(deck, player_hand, dealer_up_card=None):
+    """玩家操作回合（传入庄家明牌时给出基本策略建议）"""
     while True:
         current_score = calculate_score(player_hand)
         print(f"\n你的手牌：{show_cards(player_hand)}")
@@ -70,6 +246,11 @@ def player_turn(deck, player_hand):
         if current_score >= 21:
             break
 
+        if dealer_up_card:
+            advice = "要牌" if best_action(player_hand, dealer_up_card) == "h" else "停牌"
+            ev = expected_value(player_hand, dealer_up_card)
+            print(f"策略建议：{advice}（期望收益 {ev:+.3f}）")
+
         choice = input("要牌(h)还是停牌(s)？").lower()
         if choice == "h":
             player_hand.append(deck.pop())
@@ -107,6 +288,7 @@ def check_winner(player_score, dealer_score):
 # =====================
 def blackjack_game():
     chips = INITIAL_CHIPS
+    shoe = Shoe()
 
     while chips > 0:
         print(f"\n=== 当前筹码：{chips} ===")
@@ -116,18 +298,21 @@ def blackjack_game():
             print("筹码不足！")
             continue
 
-        # 初始化牌局
-        deck = create_deck()
-        player = [deck.pop(), deck.pop()]
-        dealer = [deck.pop(), deck.pop()]
+        # 初始化牌局（发过切牌才重新洗牌）
+        if shoe.needs_shuffle():
+            print("切牌已出，重新洗牌……")
+            shoe.shuffle()
+        player = Hand([shoe.pop(), shoe.pop()])
+        dealer = Hand([shoe.pop(), shoe.pop()])
+        print(f"庄家明牌：{show_cards(dealer, hide_first=True)}")
 
         # 玩家回合
-        player = player_turn(deck, player)
+        player = player_turn(shoe, player, dealer[1])
         player_score = calculate_score(player)
 
         # 庄家回合
         if player_score <= 21:
-            dealer = dealer_turn(deck, dealer)
+            dealer = dealer_turn(shoe, dealer)
         dealer_score = calculate_score(dealer)
 
         # 显示结果
@@ -0,0 +1,287 @@
+import asyncio
+import json
+import sys
+import time
+from functools import partial
+
+from 二十一点游戏 import (
+    INITIAL_CHIPS,
+    Hand,
+    Shoe,
+    check_winner,
+    dealer_turn,
+)
+
+# =====================
+# 全局配置
+# =====================
+HOST = "127.0.0.1"
+PORT = 8765
+NUM_TABLES = 100  # 牌桌数量
+
+# 通信协议：每行一个JSON对象
+#   {"cmd": "join", "player": "韩立", "table": 3}
+#   {"cmd": "bet", "amount": 100}
+#   {"cmd": "hit"} / {"cmd": "stand"}
+#   {"cmd": "quit"}
+# 服务端对每条命令回复一行JSON，出错时为 {"ok": false, "error": "..."}
+
+
+# =====================
+# 筹码账本与牌桌
+# =====================
+class ChipLedger:
+    """按玩家记录筹码，所有牌桌共用一本账
+
+    下注时先从余额中扣下（托管），结算时再按胜负返还，
+    因此同一玩家在多张牌桌同时下注也不会超出余额。
+    """
+
+    def __init__(self, initial=INITIAL_CHIPS):
+        self.initial = initial
+        self.balances = {}
+
+    def balance(self, player):
+        return self.balances.setdefault(player, self.initial)
+
+    def reserve(self, player, bet):
+        """下注：从余额中扣下注金"""
+        if not 0 < bet <= self.balance(player):
+            raise ValueError("筹码不足！")
+        self.balances[player] -= bet
+
+    def settle(self, player, bet, result):
+        """按胜负结算已扣下的注金（与blackjack_game相同：赢得等额，输掉下注，平局退回）"""
+        if "玩家胜" in result:
+            self.balances[player] += 2 * bet
+        elif "庄家胜" not in result:
+            self.balances[player] += bet
+        return self.balances[player]
+
+
+class Table:
+    """牌桌：每桌一个牌靴，桌上各座位轮流从同一牌靴取牌"""
+
+    def __init__(self, table_id):
+        self.table_id = table_id
+        self.shoe = Shoe()
+        self.seats = set()
+        self.hands_played = 0
+
+    def deal(self):
+        """开新一局，返回 (玩家手牌, 庄家手牌)
+
+        已发过切牌时，要等桌上所有座位都打完手上这局才重新洗牌，
+        否则其他座位会从又包含了自己手牌的牌靴里继续取牌。
+        """
+        if self.shoe.needs_shuffle() and all(s.hand is None for s in self.seats):
+            self.shoe.shuffle()
+        player = Hand([self.shoe.pop(), self.shoe.pop()])
+        dealer = Hand([self.shoe.pop(), self.shoe.pop()])
+        return player, dealer
+
+
+class Seat:
+    """一个连接对应的座位状态（当前下注与手牌）"""
+
+    def __init__(self, player, table):
+        self.player = player
+        self.table = table
+        self.bet = 0
+        self.hand = None
+        self.dealer = None
+
+
+# =====================
+# 服务端
+# =====================
+class BlackjackServer:
+    def __init__(self, num_tables=NUM_TABLES):
+        self.tables = [Table(i) for i in range(num_tables)]
+        self.ledger = ChipLedger()
+        self.hands_played = 0
+
+    async def handle(self, reader, writer):
+        """处理一个玩家连接（每个连接一个协程，互不阻塞）"""
+        seat = None
+        try:
+            while line := await reader.readline():
+                leaving = False
+                try:
+                    request = json.loads(line)
+                    seat, reply = self.dispatch(seat, request)
+                    leaving = request["cmd"] == "quit"
+                except (ValueError, KeyError, TypeError) as e:
+                    reply = {"ok": False, "error": str(e)}
+                writer.write(json.dumps(reply, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+                if leaving:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.leave(seat)  # 断线时未结束的一局按认输处理
+            writer.close()
+
+    def dispatch(self, seat, request):
+        """执行一条命令，返回 (座位, 回复)"""
+        cmd = request["cmd"]
+        if cmd == "join":
+            table = self.tables[int(request["table"]) % len(self.tables)]
+            self.leave(seat)  # 换桌前先了结当前这一局
+            seat = Seat(str(request["player"]), table)
+            table.seats.add(seat)
+            return seat, {
+                "ok": True,
+                "table": table.table_id,
+                "chips": self.ledger.balance(seat.player),
+            }
+        if cmd == "quit":
+            self.leave(seat)
+            return None, {"ok": True, "chips": self.ledger.balance(seat.player) if seat else None}
+        if seat is None:
+            raise ValueError("请先入座（join）")
+
+        if cmd == "bet":
+            if seat.hand is not None:
+                raise ValueError("本局尚未结束")
+            amount = int(request["amount"])
+            self.ledger.reserve(seat.player, amount)
+            seat.bet = amount
+            seat.hand, seat.dealer = seat.table.deal()
+        elif cmd == "hit":
+            if seat.hand is None:
+                raise ValueError("请先下注")
+            seat.hand.append(seat.table.shoe.pop())
+        elif cmd == "stand":
+            if seat.hand is None:
+                raise ValueError("请先下注")
+            return seat, self.finish(seat)
+        else:
+            raise ValueError(f"未知命令：{cmd}")
+
+        # 与player_turn一样，21点及以上自动结束玩家回合
+        if seat.hand.score >= 21:
+            return seat, self.finish(seat)
+        return seat, {
+            "ok": True,
+            "hand": seat.hand,
+            "score": seat.hand.score,
+            "dealer_up": seat.dealer[1],
+        }
+
+    def leave(self, seat):
+        """离开座位：未结束的一局视为认输（注金已在下注时扣除，不再返还）"""
+        if seat is None:
+            return
+        if seat.hand is not None:
+            seat.hand = seat.dealer = None
+            seat.bet = 0
+        seat.table.seats.discard(seat)
+
+    def finish(self, seat):
+        """庄家回合并结算"""
+        player_score = seat.hand.score
+        if player_score <= 21:
+            dealer_turn(seat.table.shoe, seat.dealer)
+        result = check_winner(player_score, seat.dealer.score)
+        chips = self.ledger.settle(seat.player, seat.bet, result)
+        reply = {
+            "ok": True,
+            "hand": seat.hand,
+            "score": player_score,
+            "dealer": seat.dealer,
+            "dealer_score": seat.dealer.score,
+            "result": result,
+            "chips": chips,
+        }
+        seat.hand = seat.dealer = None
+        seat.table.hands_played += 1
+        self.hands_played += 1
+        return reply
+
+    async def start(self, host=HOST, port=PORT, path=None):
+        """启动服务：给定path时使用Unix套接字，否则使用TCP"""
+        if path:
+            return await asyncio.start_unix_server(self.handle, path, backlog=4096)
+        return await asyncio.start_server(self.handle, host, port, backlog=4096)
+
+
+# =====================
+# 压力测试客户端
+# =====================
+async def _play_seat(connect, seat_id, hands):
+    """模拟一个座位：下注后17点以下要牌，打满hands局"""
+    reader, writer = await connect()
+
+    async def send(request):
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    await send({"cmd": "join", "player": f"弟子{seat_id}", "table": seat_id})
+    played = 0
+    for _ in range(hands):
+        reply = await send({"cmd": "bet", "amount": 1})
+        while "result" not in reply:
+            cmd = "hit" if reply["score"] < 17 else "stand"
+            reply = await send({"cmd": cmd})
+        played += 1
+    await send({"cmd": "quit"})
+    writer.close()
+    return played
+
+
+def _raise_fd_limit(needed):
+    """每个座位占两个文件描述符，必要时调高进程上限"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+
+async def load_test(seats=1000, hands=20, host=HOST, port=PORT, path=None):
+    """在同一事件循环里启动服务端，并用seats个并发座位压测"""
+    _raise_fd_limit(seats * 2 + 100)
+    server = BlackjackServer()
+    listener = await server.start(host, port, path)
+
+    if path:
+        connect = partial(asyncio.open_unix_connection, path)
+    else:
+        connect = partial(asyncio.open_connection, host, port)
+
+    started = time.perf_counter()
+    played = await asyncio.gather(
+        *(_play_seat(connect, i, hands) for i in range(seats))
+    )
+    elapsed = time.perf_counter() - started
+
+    listener.close()
+    await listener.wait_closed()
+    total = sum(played)
+    print(f"{seats}个座位共打{total}局，用时{elapsed:.2f}秒，{total / elapsed:,.0f} 局/秒")
+    return total / elapsed
+
+
+async def serve(host=HOST, port=PORT, path=None):
+    server = BlackjackServer()
+    listener = await server.start(host, port, path)
+    print(f"二十一点牌桌服务已启动：{path or f'{host}:{port}'}（{NUM_TABLES}张牌桌）")
+    async with listener:
+        await listener.serve_forever()
+
+
+# =====================
+# 启动服务
+# =====================
+if __name__ == "__main__":
+    # python 牌桌服务器.py          启动服务
+    # python 牌桌服务器.py bench    1000个座位压测
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        asyncio.run(load_test())
+    else:
+        asyncio.run(serve())
@@ -0,0 +1,291 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np  # 需安装numpy
+
+from 二十一点游戏 import (
+    CARD_VALUES,
+    PENETRATION,
+    RANKS,
+    Shoe,
+    calculate_score,
+    check_winner,
+    create_deck,
+    dealer_turn,
+    strategy_table,
+)
+
+# =====================
+# 牌面编码
+# =====================
+# 每张牌只用点数下标(0~12)表示，花色不影响胜负，模拟时直接省略
+RANK_VALUES = np.array([CARD_VALUES[rank] for rank in RANKS], dtype=np.int16)
+CARDS_PER_RANK = 4  # 每副牌每种点数4张
+
+
+# =====================
+# 玩家策略（向量化：输入数组，返回“是否要牌”的布尔数组）
+# =====================
+def dealer_mimic(score, soft, dealer_up):
+    """模仿庄家：17点以下要牌"""
+    return score < 17
+
+
+def _stand_on(score, soft, dealer_up, threshold):
+    return score < threshold
+
+
+def stand_on(threshold):
+    """达到threshold点就停牌（partial可被子进程序列化）"""
+    return partial(_stand_on, threshold=threshold)
+
+
+# 基本策略查找表：HIT_TABLE[点数, 是否软牌, 庄家明牌] -> 是否要牌
+HIT_TABLE = np.zeros((22, 2, 12), dtype=bool)
+for (_score, _soft, _up), (_action, _) in strategy_table().items():
+    HIT_TABLE[_score, int(_soft), _up] = _action == "h"
+
+
+def basic_strategy(score, soft, dealer_up):
+    """按预先计算的基本策略表要牌/停牌"""
+    return HIT_TABLE[score, soft.astype(np.intp), dealer_up]
+
+
+# =====================
+# 向量化模拟
+# =====================
+def _best_score(total, aces):
+    """与calculate_score相同的规则：A先按11计，爆牌时逐张改按1计"""
+    reduce = np.minimum(aces, np.maximum(0, (total - 12) // 10))
+    return total - 10 * reduce, aces > reduce
+
+
+class HandSimulator:
+    """同时推进batch手牌的模拟器，每条通道各自拥有一副牌靴的剩余张数
+
+    penetration为None时每手换新牌靴（同create_deck）；否则牌靴跨手保留，
+    发牌超过切牌位置后，在下一手开始前重新洗牌（同Shoe）。
+    """
+
+    def __init__(self, batch, num_decks=6, penetration=None, rng=None):
+        self.batch = batch
+        self.full_counts = np.full(len(RANKS), CARDS_PER_RANK * num_decks, np.int32)
+        self.shoe_size = int(self.full_counts.sum())
+        self.penetration = penetration
+        self.rng = rng or np.random.default_rng()
+        self.counts = np.empty((batch, len(RANKS)), dtype=np.int32)
+        self.remaining = np.empty(batch, dtype=np.int32)
+        self._new_shoes(np.arange(batch))
+
+    def _new_shoes(self, lanes):
+        """给指定通道换一副新洗好的牌靴（等价于create_deck）"""
+        self.counts[lanes] = self.full_counts
+        self.remaining[lanes] = self.shoe_size
+
+    def _draw(self, lanes):
+        """从各通道的牌靴中无放回地各抽一张，返回点数值"""
+        empty = lanes[self.remaining[lanes] == 0]
+        if len(empty):
+            self._new_shoes(empty)
+        cumulative = self.counts[lanes].cumsum(axis=1)
+        pick = (self.rng.random(len(lanes)) * self.remaining[lanes]).astype(np.int32)
+        ranks = (cumulative <= pick[:, None]).sum(axis=1)
+        self.counts[lanes, ranks] -= 1
+        self.remaining[lanes] -= 1
+        return RANK_VALUES[ranks]
+
+    def _deal_into(self, lanes, total, aces):
+        values = self._draw(lanes)
+        total[lanes] += values
+        aces[lanes] += values == 11
+
+    def play(self, strategy):
+        """每条通道各打一手牌，返回玩家输赢（+1/0/-1）数组"""
+        n = self.batch
+        everyone = np.arange(n)
+        if self.penetration is None:
+            self._new_shoes(everyone)
+        else:
+            cut_card = int(self.shoe_size * self.penetration)
+            self._new_shoes(np.flatnonzero(self.shoe_size - self.remaining >= cut_card))
+
+        player_total = np.zeros(n, np.int32)
+        player_aces = np.zeros(n, np.int32)
+        dealer_total = np.zeros(n, np.int32)
+        dealer_aces = np.zeros(n, np.int32)
+
+        # 发牌顺序与blackjack_game一致：玩家两张、庄家两张，第二张为明牌
+        self._deal_into(everyone, player_total, player_aces)
+        self._deal_into(everyone, player_total, player_aces)
+        self._deal_into(everyone, dealer_total, dealer_aces)
+        dealer_up = self._draw(everyone)
+        dealer_total += dealer_up
+        dealer_aces += dealer_up == 11
+
+        # 玩家回合：21点及以上自动停止，其余由策略决定
+        player_score, soft = _best_score(player_total, player_aces)
+        playing = player_score < 21
+        while True:
+            lanes = np.flatnonzero(playing)
+            if not len(lanes):
+                break
+            hit = strategy(player_score[lanes], soft[lanes], dealer_up[lanes])
+            lanes = lanes[hit]
+            playing[:] = False
+            if not len(lanes):
+                break
+            self._deal_into(lanes, player_total, player_aces)
+            player_score, soft = _best_score(player_total, player_aces)
+            playing[lanes] = player_score[lanes] < 21
+
+        # 庄家回合：玩家未爆牌时，17点以下继续要牌（同dealer_turn）
+        dealer_score, _ = _best_score(dealer_total, dealer_aces)
+        while True:
+            lanes = np.flatnonzero((player_score <= 21) & (dealer_score < 17))
+            if not len(lanes):
+                break
+            self._deal_into(lanes, dealer_total, dealer_aces)
+            dealer_score, _ = _best_score(dealer_total, dealer_aces)
+
+        # 胜负判定（同check_winner）
+        payoff = np.sign(player_score - dealer_score)
+        payoff[dealer_score > 21] = 1
+        payoff[player_score > 21] = -1
+        return payoff
+
+
+def _simulate_chunk(hands, strategy, batch, penetration, seed):
+    """单进程跑hands手牌，返回 (手数, 收益和, 收益平方和)"""
+    simulator = HandSimulator(
+        min(batch, hands), penetration=penetration, rng=np.random.default_rng(seed)
+    )
+    played = total = total_sq = 0
+    while played < hands:
+        payoff = simulator.play(strategy)[: hands - played]
+        played += len(payoff)
+        total += int(payoff.sum())
+        total_sq += int((payoff * payoff).sum())
+    return played, total, total_sq
+
+
+def simulate(
+    hands,
+    strategy=dealer_mimic,
+    batch=100_000,
+    workers=1,
+    penetration=None,
+    seed=None,
+):
+    """模拟hands手牌，统计庄家优势与方差
+
+    workers>1时把手数平均分给多个进程，各进程使用独立的随机数流。
+    penetration不为None时使用跨手保留的牌靴（见HandSimulator）。
+    """
+    started = time.perf_counter()
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    chunks = [hands // workers + (i < hands % workers) for i in range(workers)]
+
+    if workers == 1:
+        results = [_simulate_chunk(hands, strategy, batch, penetration, seeds[0])]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(
+                pool.map(
+                    _simulate_chunk,
+                    chunks,
+                    [strategy] * workers,
+                    [batch] * workers,
+                    [penetration] * workers,
+                    seeds,
+                )
+            )
+
+    played = sum(r[0] for r in results)
+    mean = sum(r[1] for r in results) / played
+    variance = sum(r[2] for r in results) / played - mean**2
+    elapsed = time.perf_counter() - started
+    return {
+        "hands": played,
+        "house_edge": -mean,
+        "variance": variance,
+        "std_error": (variance / played) ** 0.5,
+        "hands_per_sec": played / elapsed,
+    }
+
+
+# =====================
+# 逐手参考实现（直接调用原游戏函数，用于核对向量化结果）
+# =====================
+def _is_soft(hand):
+    hard = sum(CARD_VALUES[card[1]] for card in hand) - 10 * sum(
+        1 for card in hand if card[1] == "A"
+    )
+    return any(card[1] == "A" for card in hand) and hard + 10 <= 21
+
+
+def play_reference_hand(strategy, shoe=None):
+    """按原游戏流程打一手牌，返回玩家输赢（+1/0/-1）
+
+    传入shoe时从牌靴发牌（需要洗牌时先洗），否则每手新建一副牌。
+    """
+    if shoe is None:
+        deck = create_deck()
+    else:
+        if shoe.needs_shuffle():
+            shoe.shuffle()
+        deck = shoe
+    player = [deck.pop(), deck.pop()]
+    dealer = [deck.pop(), deck.pop()]
+    dealer_up = CARD_VALUES[dealer[1][1]]
+
+    while True:
+        score = calculate_score(player)
+        if score >= 21 or not strategy(score, _is_soft(player), dealer_up):
+            break
+        player.append(deck.pop())
+
+    player_score = calculate_score(player)
+    if player_score <= 21:
+        dealer = dealer_turn(deck, dealer)
+    result = check_winner(player_score, calculate_score(dealer))
+
+    if "玩家胜" in result:
+        return 1
+    elif "庄家胜" in result:
+        return -1
+    return 0
+
+
+# =====================
+# 运行示例
+# =====================
+if __name__ == "__main__":
+    reference = [play_reference_hand(dealer_mimic) for _ in range(50_000)]
+    print(f"逐手参考实现（5万手）：庄家优势 {-np.mean(reference):.4f}")
+
+    shoe = Shoe()
+    reference = [play_reference_hand(dealer_mimic, shoe) for _ in range(50_000)]
+    print(f"逐手参考实现（牌靴，5万手）：庄家优势 {-np.mean(reference):.4f}")
+    report = simulate(1_000_000, dealer_mimic, penetration=PENETRATION, seed=2025)
+    print(f"模仿庄家（牌靴，单进程）：庄家优势 {report['house_edge']:.4f}")
+
+    for name, strategy in [
+        ("模仿庄家", dealer_mimic),
+        ("12点停牌", stand_on(12)),
+        ("基本策略", basic_strategy),
+    ]:
+        report = simulate(1_000_000, strategy, seed=2025)
+        print(
+            f"{name}（单进程）：庄家优势 {report['house_edge']:.4f} "
+            f"± {report['std_error']:.4f}，方差 {report['variance']:.4f}，"
+            f"{report['hands_per_sec']:,.0f} 手/秒"
+        )
+
+    workers = os.cpu_count() or 1
+    report = simulate(10_000_000, dealer_mimic, workers=workers, seed=2025)
+    print(
+        f"模仿庄家（{workers}进程，1000万手）：庄家优势 {report['house_edge']:.4f}，"
+        f"{report['hands_per_sec']:,.0f} 手/秒"
+    )
@@ -0,0 +1,157 @@
+import time
+
+import numpy as np  # 需安装numpy
+
+from 灵兽对战系统 import FirePhoenix, SpiritBeast, WaterDragon
+
+# --------------------------
+# 编码表
+# --------------------------
+ELEMENT_CODES = {element: i for i, element in enumerate(SpiritBeast.ELEMENTS)}
+MULTIPLIERS = np.array(
+    [
+        [SpiritBeast.MULTIPLIERS[a, t] for t in SpiritBeast.ELEMENTS]
+        for a in SpiritBeast.ELEMENTS
+    ]
+)  # MULTIPLIERS[攻击方属性, 防守方属性]
+
+PLAIN, PHOENIX, DRAGON = 0, 1, 2  # 灵兽种类
+SKILL_CHANCE = 0.3  # 涅槃/治疗触发概率
+HEAL_RANGE = (20, 30)  # 治疗量（同WaterDragon.heal）
+DAMAGE_RANGE = (10, 20)  # 基础伤害（同SpiritBeast.attack）
+
+
+def _kind_of(beast):
+    if isinstance(beast, FirePhoenix):
+        return PHOENIX
+    if isinstance(beast, WaterDragon):
+        return DRAGON
+    return PLAIN
+
+
+# --------------------------
+# 向量化对战
+# --------------------------
+class BattleBatch:
+    """K场对战按“结构数组”存放：灵力、初始灵力、属性、种类都是 (K, 2) 的数组
+
+    每调用一次step，所有未结束的对战同时推进一回合，规则与BattleSystem相同。
+    """
+
+    def __init__(self, power, element, kind, seed=None):
+        self.power = np.asarray(power, dtype=np.int64)
+        self.max_power = self.power.copy()  # 朱雀涅槃后恢复到的灵力（同FirePhoenix.special_skill）
+        self.element = np.asarray(element, dtype=np.int8)
+        self.kind = np.asarray(kind, dtype=np.int8)
+        self.rounds = np.zeros(len(self.power), dtype=np.int64)
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_pairs(cls, pairs, seed=None):
+        """由 [(灵兽1, 灵兽2), ...] 构建"""
+        return cls(
+            [[b.power for b in pair] for pair in pairs],
+            [[ELEMENT_CODES[b.element] for b in pair] for pair in pairs],
+            [[_kind_of(b) for b in pair] for pair in pairs],
+            seed,
+        )
+
+    @classmethod
+    def repeat(cls, factory1, factory2, battles, seed=None):
+        """同一对阵重复battles场"""
+        pair = (factory1(), factory2())
+        batch = cls.from_pairs([pair], seed)
+        batch.power = np.repeat(batch.power, battles, axis=0)
+        batch.max_power = np.repeat(batch.max_power, battles, axis=0)
+        batch.element = np.repeat(batch.element, battles, axis=0)
+        batch.kind = np.repeat(batch.kind, battles, axis=0)
+        batch.rounds = np.zeros(battles, dtype=np.int64)
+        return batch
+
+    def active(self):
+        """双方都存活的对战下标"""
+        return np.flatnonzero((self.power > 0).all(axis=1))
+
+    def step(self, battles):
+        """让指定的对战各进行一回合"""
+        rng = self.rng
+        n = len(battles)
+        attacker = rng.integers(0, 2, n)  # 同random.sample随机决定先后手
+        defender = 1 - attacker
+        kind = self.kind[battles, attacker]
+        roll = rng.random(n)
+
+        rebirth = (kind == PHOENIX) & (roll < SKILL_CHANCE)
+        heal = (kind == DRAGON) & (roll < SKILL_CHANCE)
+        hit = ~(rebirth | heal)
+
+        b, a = battles[rebirth], attacker[rebirth]
+        self.power[b, a] = self.max_power[b, a]
+        self.power[battles[heal], attacker[heal]] += rng.integers(
+            HEAL_RANGE[0], HEAL_RANGE[1] + 1, heal.sum()
+        )
+
+        b, a, d = battles[hit], attacker[hit], defender[hit]
+        base = rng.integers(DAMAGE_RANGE[0], DAMAGE_RANGE[1] + 1, len(b))
+        damage = (base * MULTIPLIERS[self.element[b, a], self.element[b, d]]).astype(
+            np.int64
+        )
+        self.power[b, d] -= damage
+        self.rounds[battles] += 1
+
+    def run(self, max_rounds=100_000):
+        """打到所有对战结束，返回胜者下标数组（0/1，超过max_rounds未分胜负为-1）"""
+        for _ in range(max_rounds):
+            battles = self.active()
+            if not len(battles):
+                break
+            self.step(battles)
+        winner = np.where(self.power[:, 0] > 0, 0, 1)
+        winner[(self.power > 0).all(axis=1)] = -1
+        return winner
+
+
+# --------------------------
+# 与BattleSystem对比
+# --------------------------
+def compare_with_battle_system(name1, factory1, name2, factory2, battles=20000):
+    """同一对阵分别用两种引擎模拟，比较胜率与平均回合数"""
+    from 批量对战模拟 import run_matchup
+
+    started = time.perf_counter()
+    wins, total_rounds = run_matchup(name1, factory1, name2, factory2, battles, 0)
+    reference_time = time.perf_counter() - started
+    p_ref, rounds_ref = wins / battles, total_rounds / battles
+
+    started = time.perf_counter()
+    batch = BattleBatch.repeat(factory1, factory2, battles, seed=0)
+    winner = batch.run()
+    vector_time = time.perf_counter() - started
+    p_vec, rounds_vec = (winner == 0).mean(), batch.rounds.mean()
+
+    # 两个独立样本胜率差的z值，|z|<3即可认为统计上一致
+    pooled = (p_ref + p_vec) / 2
+    spread = (2 * pooled * (1 - pooled) / battles) ** 0.5
+    z = (p_ref - p_vec) / spread if spread else 0.0
+    print(
+        f"{name1} vs {name2}：胜率 {p_ref:.3f} / {p_vec:.3f}（z={z:+.2f}），"
+        f"平均回合 {rounds_ref:.1f} / {rounds_vec:.1f}，"
+        f"速度 {battles / reference_time:,.0f} / {battles / vector_time:,.0f} 场/秒"
+    )
+
+
+# --------------------------
+# 启动对战
+# --------------------------
+if __name__ == "__main__":
+    from 批量对战模拟 import BEASTS
+
+    print("（每项依次为 BattleSystem / 向量化引擎）")
+    for name1, name2 in [("朱雀", "玄武"), ("玄武", "青龙"), ("白虎", "朱雀"), ("青龙", "麒麟")]:
+        compare_with_battle_system(name1, BEASTS[name1], name2, BEASTS[name2])
+
+    battles = 1_000_000
+    started = time.perf_counter()
+    BattleBatch.repeat(BEASTS["玄武"], BEASTS["白虎"], battles, seed=1).run()
+    elapsed = time.perf_counter() - started
+    print(f"\n向量化引擎：{battles}场对战用时{elapsed:.2f}秒，{battles / elapsed:,.0f} 场/秒")
@@ -0,0 +1,104 @@
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+from pathlib import Path
+
+from 灵兽对战系统 import BattleSystem, FirePhoenix, SpiritBeast, WaterDragon
+
+# --------------------------
+# 参战灵兽（名字 -> 创建函数，需可被子进程序列化）
+# --------------------------
+BEASTS = {
+    "朱雀": FirePhoenix,
+    "玄武": WaterDragon,
+    "青龙": partial(SpiritBeast, "青龙", "木", 190),
+    "白虎": partial(SpiritBeast, "白虎", "金", 190),
+    "麒麟": partial(SpiritBeast, "麒麟", "土", 190),
+}
+
+
+# --------------------------
+# 批量对战
+# --------------------------
+def battle_seeds(seed, name1, name2, battles):
+    """由总种子和对阵双方推出每场对战的种子，结果与进程划分无关"""
+    rng = random.Random(f"{seed}:{name1}:{name2}")
+    return [rng.getrandbits(64) for _ in range(battles)]
+
+
+def run_matchup(name1, factory1, name2, factory2, battles, seed, log_path=None):
+    """安静模式下打battles场，返回 (一号胜场, 总回合数)
+
+    给出log_path时把每场的对战记录依次写入该文件，可用read_logs读回。
+    """
+    wins = total_rounds = 0
+    with ExitStack() as stack:
+        log_file = stack.enter_context(open(log_path, "wb")) if log_path else None
+        for battle_seed in battle_seeds(seed, name1, name2, battles):
+            first = factory1()
+            arena = BattleSystem(first, factory2(), seed=battle_seed, verbose=False)
+            if arena.start_battle() is first:
+                wins += 1
+            total_rounds += arena.rounds
+            if log_file:
+                log_file.write(arena.log.to_bytes())
+    return wins, total_rounds
+
+
+def win_rate_matrix(beasts=BEASTS, battles=1000, seed=0, workers=None, log_dir=None):
+    """所有灵兽两两对战，返回 (名字列表, 胜率矩阵, 平均回合矩阵)
+
+    矩阵第i行第j列表示第i只灵兽对第j只灵兽的结果，每个对阵作为一个任务分给进程池。
+    给出log_dir时每个对阵的对战记录保存为 log_dir/甲-乙.btl。
+    """
+    names = list(beasts)
+    pairs = [(a, b) for a in names for b in names]
+    if log_dir:
+        Path(log_dir).mkdir(parents=True, exist_ok=True)
+        log_paths = [Path(log_dir) / f"{a}-{b}.btl" for a, b in pairs]
+    else:
+        log_paths = [None] * len(pairs)
+    with ProcessPoolExecutor(workers) as pool:
+        results = pool.map(
+            run_matchup,
+            [a for a, _ in pairs],
+            [beasts[a] for a, _ in pairs],
+            [b for _, b in pairs],
+            [beasts[b] for _, b in pairs],
+            [battles] * len(pairs),
+            [seed] * len(pairs),
+            log_paths,
+        )
+        results = dict(zip(pairs, results))
+
+    win_rates = [[results[a, b][0] / battles for b in names] for a in names]
+    avg_rounds = [[results[a, b][1] / battles for b in names] for a in names]
+    return names, win_rates, avg_rounds
+
+
+def print_matrix(title, names, matrix, fmt):
+    print(f"\n=== {title} ===")
+    print("      " + "".join(f"{name:>8}" for name in names))
+    for name, row in zip(names, matrix):
+        print(f"{name:<6}" + "".join(f"{value:>10{fmt}}" for value in row))
+
+
+# --------------------------
+# 启动模拟
+# --------------------------
+if __name__ == "__main__":
+    battles = 2000
+    started = time.perf_counter()
+    names, win_rates, avg_rounds = win_rate_matrix(
+        battles=battles, seed=2025, log_dir="battle_logs"
+    )
+    elapsed = time.perf_counter() - started
+
+    print_matrix("胜率（行对列）", names, win_rates, ".1%")
+    print_matrix("平均回合数", names, avg_rounds, ".1f")
+    total = battles * len(names) ** 2
+    print(f"\n共{total}场对战，用时{elapsed:.2f}秒，{total / elapsed:,.0f} 场/秒")
+    log_bytes = sum(p.stat().st_size for p in Path("battle_logs").glob("*.btl"))
+    print(f"对战记录共{log_bytes / 1024:.0f}KB，平均每场{log_bytes / total:.0f}字节")
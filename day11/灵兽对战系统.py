@@ -1,9 +1,24 @@
 import random
+import struct
 
 
 # --------------------------
 # 基础类定义
 # --------------------------
+def _element_multipliers(elements):
+    """预先算好 (攻击方属性, 防守方属性) -> 伤害倍率"""
+    table = {}
+    for attacker in elements:
+        for target, relation in elements.items():
+            if attacker == relation["克"]:
+                table[attacker, target] = 1.5  # 克制伤害加成
+            elif attacker == relation["被克"]:
+                table[attacker, target] = 0.5  # 被克伤害减免
+            else:
+                table[attacker, target] = 1.0
+    return table
+
+
 class SpiritBeast:
     ELEMENTS = {
         "火": {"克": "金", "被克": "水"},
@@ -12,24 +27,24 @@ class SpiritBeast:
         "木": {"克": "土", "被克": "金"},
         "金": {"克": "木", "被克": "火"},
     }
+    MULTIPLIERS = _element_multipliers(ELEMENTS)
 
     def __init__(self, name, element, power=100):
         self.name = name
         self.element = element
         self.power = power
+        self.max_power = power  # 初始灵力（朱雀涅槃时恢复到这个值）
 
     def check_element(self, target):
-        """五行相克判定"""
-        if self.element == self.ELEMENTS[target.element]["克"]:
-            return 1.5  # 克制伤害加成
-        elif self.element == self.ELEMENTS[target.element]["被克"]:
-            return 0.5  # 被克伤害减免
-        return 1.0
-
-    def attack(self, target):
-        damage = random.randint(10, 20) * self.check_element(target)
+        """五行相克判定（查预先算好的倍率表）"""
+        return self.MULTIPLIERS[self.element, target.element]
+
+    def attack(self, target, rng=random, verbose=True):
+        damage = rng.randint(10, 20) * self.check_element(target)
         target.power -= int(damage)
-        print(f"{self.name}对{target.name}造成{int(damage)}点伤害！")
+        if verbose:
+            print(f"{self.name}对{target.name}造成{int(damage)}点伤害！")
+        return int(damage)
 
     def is_alive(self):
         return self.power > 0
@@ -42,50 +57,190 @@ class FirePhoenix(SpiritBeast):
     def __init__(self):
         super().__init__("朱雀", "火", 200)
 
-    def special_skill(self):
-        print("朱雀涅槃重生，恢复全部灵力！")
-        self.power = 200
+    def special_skill(self, verbose=True):
+        if verbose:
+            print("朱雀涅槃重生，恢复全部灵力！")
+        self.power = self.max_power
 
 
 class WaterDragon(SpiritBeast):
     def __init__(self):
         super().__init__("玄武", "水", 180)
 
-    def heal(self):
-        recover = random.randint(20, 30)
+    def heal(self, rng=random, verbose=True):
+        recover = rng.randint(20, 30)
         self.power += recover
-        print(f"玄武引动水灵，恢复{recover}点灵力！")
+        if verbose:
+            print(f"玄武引动水灵，恢复{recover}点灵力！")
+        return recover
+
+
+def create_beast(cls, name, element, power):
+    """按指定名字/属性/灵力创建某类灵兽（朱雀、玄武的构造函数写死了这些值）"""
+    beast = cls.__new__(cls)
+    SpiritBeast.__init__(beast, name, element, power)
+    return beast
+
+
+# --------------------------
+# 对战记录
+# --------------------------
+class BattleLog:
+    """紧凑的二进制对战记录：种子 + 双方初始状态 + 每回合1字节动作码
+
+    动作码：最高位为出手方下标，其后2位为动作（攻击/涅槃/治疗），低5位为伤害或治疗量。
+    """
+
+    MAGIC = b"BTL1"
+    HEADER = struct.Struct("<4sQI")  # 标识、种子、回合数
+    BEAST = struct.Struct("<BBiB")  # 种类、属性、初始灵力、名字字节数
+    KINDS = [SpiritBeast, FirePhoenix, WaterDragon]
+    ELEMENT_NAMES = list(SpiritBeast.ELEMENTS)
+    ATTACK, REBIRTH, HEAL = 0, 1, 2
+    MAX_SEED = 2**64 - 1  # 记录头中种子占8字节
+
+    def __init__(self, seed, beasts, actions=b""):
+        if not isinstance(seed, int) or not 0 <= seed <= self.MAX_SEED:
+            raise ValueError(f"种子必须是0到2**64-1之间的整数：{seed!r}")
+        self.seed = seed
+        self.beasts = beasts  # [(种类下标, 属性下标, 初始灵力, 名字), ...]
+        self.actions = bytearray(actions)
+
+    @classmethod
+    def start(cls, seed, beasts):
+        """按对战开始时的双方状态新建记录"""
+        info = []
+        for b in beasts:
+            kind = max(i for i, k in enumerate(cls.KINDS) if isinstance(b, k))
+            info.append((kind, cls.ELEMENT_NAMES.index(b.element), b.power, b.name))
+        return cls(seed, info)
+
+    def record(self, attacker, action, value):
+        self.actions.append(attacker << 7 | action << 5 | value)
+
+    def __len__(self):
+        return len(self.actions)
+
+    # ---------- 序列化 ----------
+
+    def to_bytes(self):
+        parts = [self.HEADER.pack(self.MAGIC, self.seed, len(self.actions))]
+        for kind, element, power, name in self.beasts:
+            encoded = name.encode("utf-8")
+            parts.append(self.BEAST.pack(kind, element, power, len(encoded)) + encoded)
+        parts.append(bytes(self.actions))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data, offset=0):
+        """解析一条记录，返回 (记录, 下一条记录的起始位置)"""
+        magic, seed, rounds = cls.HEADER.unpack_from(data, offset)
+        if magic != cls.MAGIC:
+            raise ValueError("不是有效的对战记录")
+        offset += cls.HEADER.size
+        beasts = []
+        for _ in range(2):
+            kind, element, power, size = cls.BEAST.unpack_from(data, offset)
+            offset += cls.BEAST.size
+            beasts.append((kind, element, power, data[offset : offset + size].decode()))
+            offset += size
+        return cls(seed, beasts, data[offset : offset + rounds]), offset + rounds
+
+    # ---------- 回放 ----------
+
+    def create_beasts(self):
+        """按记录重建对战开始时的双方"""
+        return [
+            create_beast(self.KINDS[kind], name, self.ELEMENT_NAMES[element], power)
+            for kind, element, power, name in self.beasts
+        ]
+
+    def fast_forward(self, rounds=None):
+        """不经随机数和打印，直接按动作码推进到第rounds回合结束，返回双方灵兽"""
+        beasts = self.create_beasts()
+        for code in self.actions[:rounds]:
+            attacker, defender = beasts[code >> 7], beasts[1 - (code >> 7)]
+            action, value = code >> 5 & 0b11, code & 0b11111
+            if action == self.ATTACK:
+                defender.power -= value
+            elif action == self.REBIRTH:
+                attacker.power = attacker.max_power  # 同FirePhoenix.special_skill
+            else:
+                attacker.power += value
+        return beasts
+
+    def replay(self, verbose=True):
+        """用记录中的种子重新打一遍（逐回合打印），返回重放的对战系统"""
+        arena = BattleSystem(*self.create_beasts(), seed=self.seed, verbose=verbose)
+        arena.start_battle()
+        return arena
+
+
+def write_logs(path, logs):
+    """把多条记录首尾相接地写入同一个文件"""
+    with open(path, "wb") as f:
+        for log in logs:
+            f.write(log.to_bytes())
+
+
+def read_logs(path):
+    """逐条读出文件中的对战记录"""
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+    while offset < len(data):
+        log, offset = BattleLog.from_bytes(data, offset)
+        yield log
 
 
 # --------------------------
 # 对战系统
 # --------------------------
 class BattleSystem:
-    def __init__(self, beast1, beast2):
+    """对战系统
+
+    seed: 随机种子（0到2**64-1的整数），相同种子的对战结果完全一致（不传时随机生成并记入对战记录）
+    verbose: 为False时不打印过程（批量模拟使用）
+    """
+
+    def __init__(self, beast1, beast2, seed=None, verbose=True):
         self.beasts = [beast1, beast2]
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.verbose = verbose
+        self.rounds = 0
+        self.log = BattleLog.start(self.seed, self.beasts)
 
     def start_battle(self):
+        rng, verbose, log = self.rng, self.verbose, self.log
         round = 1
         while all(b.is_alive() for b in self.beasts):
-            print(f"\n=== 第{round}回合 ===")
-            attacker, defender = random.sample(self.beasts, 2)
+            if verbose:
+                print(f"\n=== 第{round}回合 ===")
+            attacker, defender = rng.sample(self.beasts, 2)
 
             # 特殊技能触发
-            if isinstance(attacker, FirePhoenix) and random.random() < 0.3:
-                attacker.special_skill()
-            elif isinstance(attacker, WaterDragon) and random.random() < 0.3:
-                attacker.heal()
+            index = attacker is self.beasts[1]
+            if isinstance(attacker, FirePhoenix) and rng.random() < 0.3:
+                attacker.special_skill(verbose)
+                log.record(index, BattleLog.REBIRTH, 0)
+            elif isinstance(attacker, WaterDragon) and rng.random() < 0.3:
+                log.record(index, BattleLog.HEAL, attacker.heal(rng, verbose))
             else:
-                attacker.attack(defender)
+                log.record(index, BattleLog.ATTACK, attacker.attack(defender, rng, verbose))
 
             # 显示状态
-            for b in self.beasts:
-                print(f"{b.name} 剩余灵力：{b.power}")
+            if verbose:
+                for b in self.beasts:
+                    print(f"{b.name} 剩余灵力：{b.power}")
 
             round += 1
 
+        self.rounds = round - 1
         winner = next(b for b in self.beasts if b.is_alive())
-        print(f"\n战斗结束！胜者：{winner.name}")
+        if verbose:
+            print(f"\n战斗结束！胜者：{winner.name}")
+        return winner
 
 
 # --------------------------
@@ -96,4 +251,10 @@ if __name__ == "__main__":
     xuanwu = WaterDragon()
 
     arena = BattleSystem(zhuque, xuanwu)
-    arena.start_battle()
\ No newline at end of file
+    arena.start_battle()
+
+    # 对战记录：快进到第10回合查看双方灵力
+    log = BattleLog.from_bytes(arena.log.to_bytes())[0]
+    print(f"\n对战记录 {len(arena.log.to_bytes())} 字节，种子 {log.seed}")
+    for b in log.fast_forward(10):
+        print(f"第10回合后 {b.name} 剩余灵力：{b.power}")
\ No newline at end of file
@@ -0,0 +1,246 @@
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from 灵兽对战系统 import (
+    BattleSystem,
+    FirePhoenix,
+    SpiritBeast,
+    WaterDragon,
+    create_beast,
+)
+
+# --------------------------
+# 全局配置
+# --------------------------
+INITIAL_RATING = 1500  # 初始积分
+K_FACTOR = 24  # ELO每场最大变动
+CHECKPOINT_PATH = "ladder_checkpoint.json"
+BEAST_KINDS = {"普通": SpiritBeast, "朱雀": FirePhoenix, "玄武": WaterDragon}
+
+
+# --------------------------
+# 参赛灵兽配置
+# --------------------------
+def make_beast(config):
+    """按配置 {"name", "kind", "element", "power"} 创建灵兽"""
+    return create_beast(
+        BEAST_KINDS[config["kind"]], config["name"], config["element"], config["power"]
+    )
+
+
+def random_configs(count, seed=0):
+    """随机生成count个不同属性、灵力的参赛配置"""
+    rng = random.Random(seed)
+    elements = list(SpiritBeast.ELEMENTS)
+    return [
+        {
+            "name": f"灵兽{i:03d}",
+            "kind": rng.choice(list(BEAST_KINDS)),
+            "element": rng.choice(elements),
+            "power": rng.randrange(100, 301, 10),
+        }
+        for i in range(count)
+    ]
+
+
+# --------------------------
+# 对局（在子进程中执行）
+# --------------------------
+def play_match(config1, config2, games, seed):
+    """安静模式连打games场，返回一号的得分率（0~1）"""
+    rng = random.Random(seed)
+    wins = 0
+    for _ in range(games):
+        first = make_beast(config1)
+        arena = BattleSystem(first, make_beast(config2), rng.getrandbits(64), False)
+        wins += arena.start_battle() is first
+    return wins / games
+
+
+# --------------------------
+# 赛程编排
+# --------------------------
+def swiss_pairings(ratings, played):
+    """瑞士制：按积分排序后相邻配对，尽量避开已经交手过的对手"""
+    order = sorted(range(len(ratings)), key=lambda i: -ratings[i])
+    pairs = []
+    while len(order) > 1:
+        first = order.pop(0)
+        partner = next(
+            (j for j in order if (min(first, j), max(first, j)) not in played),
+            order[0],
+        )
+        order.remove(partner)
+        pairs.append((first, partner))
+    return pairs  # 人数为奇数时，积分最低者本轮轮空
+
+
+def round_robin_pairings(count, round_index):
+    """循环赛（圆桌法）：count-1轮内每两人恰好交手一次"""
+    players = list(range(count)) + ([None] if count % 2 else [])
+    n = len(players)
+    shift = round_index % (n - 1)
+    rotated = [players[0]] + players[1:][shift:] + players[1:][:shift]
+    pairs = [(rotated[i], rotated[n - 1 - i]) for i in range(n // 2)]
+    return [(a, b) for a, b in pairs if a is not None and b is not None]
+
+
+def rank_correlation(before, after):
+    """两次积分排名的斯皮尔曼相关系数，越接近1说明排名越稳定"""
+    n = len(before)
+    if n < 2:
+        return 1.0
+
+    def ranks(values):
+        result = [0] * n
+        for rank, i in enumerate(sorted(range(n), key=lambda i: -values[i])):
+            result[i] = rank
+        return result
+
+    d2 = sum((a - b) ** 2 for a, b in zip(ranks(before), ranks(after)))
+    return 1 - 6 * d2 / (n * (n * n - 1))
+
+
+# --------------------------
+# 天梯
+# --------------------------
+class Ladder:
+    """ELO天梯：每轮对局分给进程池，按结果逐场增量更新积分，每轮结束写检查点"""
+
+    def __init__(
+        self, configs, fmt="swiss", games=3, seed=0, checkpoint=CHECKPOINT_PATH
+    ):
+        self.configs = configs
+        self.fmt = fmt
+        self.games = games
+        self.seed = seed
+        self.checkpoint = Path(checkpoint)
+        self.ratings = [INITIAL_RATING] * len(configs)
+        self.round = 0
+        self.matches = 0
+        self.played = set()  # 已交手的 (小下标, 大下标)
+        self.history = []  # 每轮 [平均积分变动, 与上轮排名的相关系数]，用于观察收敛
+
+    # ---------- 检查点 ----------
+
+    def save(self):
+        """先写临时文件再原子替换，中途退出也不会损坏检查点"""
+        data = {
+            "configs": self.configs,
+            "fmt": self.fmt,
+            "games": self.games,
+            "seed": self.seed,
+            "ratings": self.ratings,
+            "round": self.round,
+            "matches": self.matches,
+            "played": sorted(self.played),
+            "history": self.history,
+        }
+        tmp_path = self.checkpoint.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.checkpoint)
+
+    @classmethod
+    def resume(cls, checkpoint=CHECKPOINT_PATH):
+        """从检查点恢复；不存在时返回None"""
+        if not Path(checkpoint).exists():
+            return None
+        with open(checkpoint, encoding="utf-8") as f:
+            data = json.load(f)
+        ladder = cls(
+            data["configs"], data["fmt"], data["games"], data["seed"], checkpoint
+        )
+        ladder.ratings = data["ratings"]
+        ladder.round = data["round"]
+        ladder.matches = data["matches"]
+        ladder.played = {tuple(pair) for pair in data["played"]}
+        ladder.history = data["history"]
+        return ladder
+
+    # ---------- 比赛 ----------
+
+    def pairings(self):
+        if self.fmt == "swiss":
+            return swiss_pairings(self.ratings, self.played)
+        return round_robin_pairings(len(self.configs), self.round)
+
+    def update(self, a, b, score):
+        """ELO增量更新，返回积分变动量"""
+        expected = 1 / (1 + 10 ** ((self.ratings[b] - self.ratings[a]) / 400))
+        delta = K_FACTOR * (score - expected)
+        self.ratings[a] += delta
+        self.ratings[b] -= delta
+        return abs(delta)
+
+    def play_round(self, pool):
+        pairs = self.pairings()
+        seeds = [
+            random.Random(f"{self.seed}:{self.round}:{a}:{b}").getrandbits(64)
+            for a, b in pairs
+        ]
+        scores = pool.map(
+            play_match,
+            [self.configs[a] for a, _ in pairs],
+            [self.configs[b] for _, b in pairs],
+            [self.games] * len(pairs),
+            seeds,
+            chunksize=max(1, len(pairs) // (4 * (os.cpu_count() or 1))),
+        )
+        before = list(self.ratings)
+        total_delta = 0.0
+        for (a, b), score in zip(pairs, scores):
+            total_delta += self.update(a, b, score)
+            self.played.add((min(a, b), max(a, b)))
+        self.round += 1
+        self.matches += len(pairs)
+        self.history.append(
+            [total_delta / max(len(pairs), 1), rank_correlation(before, self.ratings)]
+        )
+        self.save()
+
+    def run(self, rounds, workers=None):
+        """继续比赛到第rounds轮（已完成的轮次不会重打）"""
+        if self.fmt == "round_robin":
+            rounds = min(rounds, len(self.configs) - 1 + len(self.configs) % 2)
+        started_matches, started = self.matches, time.perf_counter()
+        with ProcessPoolExecutor(workers) as pool:
+            while self.round < rounds:
+                self.play_round(pool)
+                delta, correlation = self.history[-1]
+                print(
+                    f"第{self.round}轮完成，平均积分变动 {delta:.2f}，"
+                    f"排名相关系数 {correlation:.4f}"
+                )
+        elapsed = time.perf_counter() - started
+        matches = self.matches - started_matches
+        if matches:
+            print(f"共{matches}场比赛，用时{elapsed:.2f}秒，{matches / elapsed:,.1f} 场/秒")
+
+    def standings(self, top=10):
+        order = sorted(range(len(self.configs)), key=lambda i: -self.ratings[i])
+        return [(self.configs[i], self.ratings[i]) for i in order[:top]]
+
+
+# --------------------------
+# 启动天梯
+# --------------------------
+if __name__ == "__main__":
+    ladder = Ladder.resume()
+    if ladder:
+        print(f"从检查点恢复：已完成{ladder.round}轮")
+    else:
+        ladder = Ladder(random_configs(200), fmt="swiss", games=3, seed=2025)
+
+    ladder.run(rounds=30)
+
+    print("\n=== 天梯前十 ===")
+    for i, (config, rating) in enumerate(ladder.standings(), 1):
+        print(
+            f"{i}. {config['name']}（{config['kind']}·{config['element']}·"
+            f"灵力{config['power']}）：{rating:.0f}"
+        )
@@ -1,16 +1,87 @@
+import heapq
 import json
-from functools import reduce
-from datetime import datetime
+import os
+import queue
+import random
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce, wraps
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np  # 需安装numpy
+from sortedcontainers import SortedKeyList  # 需安装sortedcontainers
+
+
+# 日志级别
+DEBUG, INFO, WARNING, OFF = 10, 20, 30, 100
+
+
+class Instrumentation:
+    """修炼日志：分级的结构化事件写入有界环形缓冲，并按动作统计耗时直方图
+
+    level设为OFF时被装饰的方法只多一次整数比较，批量运行时使用。
+    """
+
+    def __init__(self, level=INFO, capacity=1024, console=True):
+        self.level = level
+        self.console = console  # 是否同时打印到控制台
+        self.events = deque(maxlen=capacity)  # 最近的事件，满了自动丢弃最旧的
+        self.histograms = {}  # 动作 -> 各耗时档位的次数（第i档为 [2^(i-1), 2^i) 微秒）
+
+    def configure(self, level=None, console=None):
+        if level is not None:
+            self.level = level
+        if console is not None:
+            self.console = console
+
+    def emit(self, level, action, message, **fields):
+        if level < self.level:
+            return
+        self.events.append({"time": time.time(), "level": level, "action": action, **fields})
+        if self.console:
+            print(message)
+
+    def observe(self, action, seconds):
+        bucket = int(seconds * 1_000_000).bit_length()
+        counts = self.histograms.setdefault(action, [0] * 40)
+        counts[min(bucket, 39)] += 1
+
+    def histogram(self, action):
+        """{耗时上限(微秒): 次数}，只列出有记录的档位"""
+        counts = self.histograms.get(action, [])
+        return {2**i: n for i, n in enumerate(counts) if n}
+
+
+instrumentation = Instrumentation()
 
 
 def log_activity(action):
     """修炼日志装饰器"""
 
     def decorator(func):
+        @wraps(func)
         def wrapper(self, *args):
-            print(f"{self.name}开始{action}...")
+            if instrumentation.level >= OFF:
+                return func(self, *args)
+
+            name = getattr(self, "name", "宗门")
+            instrumentation.emit(INFO, action, f"{name}开始{action}...", actor=name)
+            started = time.perf_counter()
             result = func(self, *args)
-            print(f"{action}完成！当前境界：{self.current_stage}")
+            elapsed = time.perf_counter() - started
+            instrumentation.observe(action, elapsed)
+
+            stage = getattr(self, "current_stage", None)
+            message = f"{action}完成！" + (f"当前境界：{stage}" if stage is not None else "")
+            instrumentation.emit(
+                INFO, action, message, actor=name, stage=stage, seconds=elapsed
+            )
             return result
 
         return wrapper
@@ -18,32 +89,158 @@ def log_activity(action):
     return decorator
 
 
+class DiscipleStore:
+    """弟子存储（SQLite）：按名字建主键，只写入有变化的弟子，每次保存是一个事务"""
+
+    def __init__(self, path="cultivation.db"):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")  # 写入中途崩溃也不会损坏数据库
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS disciples (
+                name TEXT PRIMARY KEY,
+                stage INTEGER NOT NULL,
+                power INTEGER,
+                last_breakthrough TEXT NOT NULL
+            )"""
+        )
+
+    def import_json(self, path):
+        """数据库为空时，一次性导入旧版cultivation.json"""
+        if not self.is_empty() or not Path(path).exists():
+            return
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO disciples VALUES (?, ?, NULL, ?)",
+                [(n, s["stage"], s["last_breakthrough"]) for n, s in data.items()],
+            )
+
+    def is_empty(self):
+        """只查是否存在任意一行，不做全表计数"""
+        return not self.conn.execute("SELECT EXISTS(SELECT 1 FROM disciples)").fetchone()[0]
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM disciples").fetchone()[0]
+
+    def last_rowid(self):
+        return self.conn.execute("SELECT MAX(rowid) FROM disciples").fetchone()[0] or 0
+
+    def get(self, name):
+        return self.conn.execute(
+            "SELECT rowid, name, stage, power, last_breakthrough FROM disciples "
+            "WHERE name = ?",
+            (name,),
+        ).fetchone()
+
+    def pages(self, page_size=1000):
+        """按rowid分页读取全部弟子"""
+        last = 0
+        while True:
+            rows = self.conn.execute(
+                "SELECT rowid, name, stage, power, last_breakthrough FROM disciples "
+                "WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last, page_size),
+            ).fetchall()
+            if not rows:
+                return
+            yield rows
+            last = rows[-1][0]
+
+    def save(self, cults):
+        """在一个事务里写入这些弟子，要么全部成功要么全部不生效"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO disciples VALUES (?, ?, ?, ?) ON CONFLICT(name) DO UPDATE "
+                "SET stage = excluded.stage, power = excluded.power, "
+                "last_breakthrough = excluded.last_breakthrough",
+                [(c.name, c._stage, c.power, c.last_breakthrough) for c in cults],
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+class LazyDisciples(Mapping):
+    """弟子字典的惰性视图：按名字访问时才从数据库读取，遍历时分页载入"""
+
+    def __init__(self, tracker):
+        self._tracker = tracker
+        self._loaded = {}
+        self._new = set()  # 尚未保存过的新弟子
+        self._complete = False
+
+    def __getitem__(self, name):
+        cult = self._loaded.get(name)
+        if cult is None and not self._complete:
+            row = self._tracker.store.get(name)
+            if row:
+                cult = self._tracker._restore(row)
+        if cult is None:
+            raise KeyError(name)
+        return cult
+
+    def load_all(self, page_size=1000):
+        if self._complete:
+            return
+        for rows in self._tracker.store.pages(page_size):
+            for row in rows:
+                if row[1] not in self._loaded:
+                    self._tracker._restore(row)
+        self._complete = True
+
+    def __iter__(self):
+        self.load_all()
+        return iter(self._loaded)
+
+    def __len__(self):
+        if self._complete:
+            return len(self._loaded)
+        return self._tracker.store.count() + len(self._new)
+
+
 class CultivationTracker:
-    def __init__(self):
-        self.disciples = {}
-        self._load_data()
-
-    def _load_data(self):
-        try:
-            with open("cultivation.json", encoding='utf-8') as f:
-                data = json.load(f)
-                self.disciples = {
-                    name: Cultivator(name, **stats) for name, stats in data.items()
-                }
-        except FileNotFoundError:
-            pass
+    def __init__(self, db_path="cultivation.db"):
+        self.store = DiscipleStore(db_path)
+        self.store.import_json("cultivation.json")
+        self.disciples = LazyDisciples(self)
+        # 战力排行索引：按(战力降序, 加入顺序)排列，增删均为O(log n)
+        self._ranking = SortedKeyList(key=lambda cult: (-cult.power, cult._order))
+        self._joined = self.store.last_rowid()  # 新弟子排在库中已有弟子之后
+        self._dirty = set()  # 有变化、待保存的弟子名
+
+    def _restore(self, row):
+        """把数据库中的一行还原为Cultivator（加入顺序沿用rowid）"""
+        rowid, name, stage, power, last_breakthrough = row
+        cult = Cultivator(name, stage, last_breakthrough)
+        if power is not None:
+            cult.power = power
+        self._register(cult, rowid)
+        return cult
+
+    def _register(self, cult, order=None):
+        """登记弟子并加入排行索引，此后战力变化会自动同步到索引"""
+        if order is None:
+            self._joined += 1
+            order = self._joined
+        cult._order = order
+        self.disciples._loaded[cult.name] = cult
+        self._ranking.add(cult)
+        cult._tracker = self
+        return cult
 
     def save_data(self):
-        data = {
-            name: {"stage": cult._stage, "last_breakthrough": cult.last_breakthrough}
-            for name, cult in self.disciples.items()
-        }
-        with open("cultivation.json", "w") as f:
-            json.dump(data, f)
+        """只把有变化的弟子写入数据库（单个事务）"""
+        dirty = (self.disciples._loaded[name] for name in self._dirty)
+        self.store.save(sorted(dirty, key=lambda cult: cult._order))  # 新弟子按加入顺序入库
+        self._dirty.clear()
+        self.disciples._new.clear()
 
     def add_disciple(self, name):
         if name not in self.disciples:
-            self.disciples[name] = Cultivator(name)
+            self._register(Cultivator(name))
+            self.disciples._new.add(name)
+            self._dirty.add(name)
 
     @log_activity("批量突破检测")
     def check_breakthroughs(self):
@@ -52,20 +249,60 @@ class CultivationTracker:
         )
 
     def power_ranking(self):
-        return sorted(self.disciples.values(), key=lambda x: x.power, reverse=True)
+        self.disciples.load_all()
+        return list(self._ranking)
+
+    def top(self, k):
+        """战力前k名"""
+        self.disciples.load_all()
+        return list(self._ranking.islice(0, k))
+
+    def rank_of(self, name):
+        """弟子的战力排名（从1开始），O(log n)"""
+        self.disciples.load_all()
+        return self._ranking.index(self.disciples[name]) + 1
 
 
 class Cultivator:
     def __init__(self, name, stage=0, last_breakthrough=None):
         self.name = name
         self._stage = stage
+        self._tracker = None  # 所属的跟踪系统（用于同步排行索引）
+        self._order = 0
         self.power = 1000 * (2**stage)
         self.last_breakthrough = last_breakthrough or datetime.now().isoformat()
 
-    def check_breakthrough(self):
+    @property
+    def current_stage(self):
+        return self._stage
+
+    @property
+    def power(self):
+        return self._power
+
+    @power.setter
+    def power(self, value):
+        """战力变化时先从排行索引取出，改完再放回（新值无效时恢复原值并放回）"""
+        tracker = self._tracker
+        if tracker:
+            tracker._ranking.remove(self)
+        old, self._power = getattr(self, "_power", None), value
+        if tracker:
+            try:
+                tracker._ranking.add(self)
+            except Exception:
+                self._power = old
+                tracker._ranking.add(self)
+                raise
+            tracker._dirty.add(self.name)
+
+    def check_breakthrough(self, now=None):
+        """now为突破时刻（模拟时传入模拟时间），默认为当前时间"""
         if self.power >= 2000 * (2**self._stage):
             self._stage += 1
-            self.last_breakthrough = datetime.now().isoformat()
+            self.last_breakthrough = (now or datetime.now()).isoformat()
+            if self._tracker:
+                self._tracker._dirty.add(self.name)
             return True
         return False
 
@@ -74,13 +311,357 @@ class Cultivator:
         self.power += hours * 10
 
 
+class SectBatch:
+    """大宗门批量模式：境界、战力、上次突破时间各存一个数组，按下标（弟子id）访问"""
+
+    def __init__(self, names, stage, power, last_breakthrough):
+        self.names = list(names)
+        self.stage = np.asarray(stage, dtype=np.int64)
+        self.power = np.asarray(power, dtype=np.int64)
+        self.last_breakthrough = np.asarray(last_breakthrough, dtype="datetime64[us]")
+
+    @classmethod
+    def from_tracker(cls, tracker):
+        cults = list(tracker.disciples.values())
+        return cls(
+            [c.name for c in cults],
+            [c._stage for c in cults],
+            [c.power for c in cults],
+            [c.last_breakthrough for c in cults],
+        )
+
+    @classmethod
+    def create(cls, count, prefix="弟子"):
+        """新建count名零境界弟子"""
+        now = np.datetime64(datetime.now(), "us")
+        return cls(
+            [f"{prefix}{i}" for i in range(count)],
+            np.zeros(count, dtype=np.int64),
+            np.full(count, 1000, dtype=np.int64),
+            np.full(count, now),
+        )
+
+    def meditate(self, ids, hours):
+        """批量运转周天（hours可为标量或与ids等长的数组）"""
+        self.power[ids] += np.asarray(hours) * 10
+
+    def check_breakthroughs(self, now=None):
+        """一次向量化扫描完成所有突破，只返回发生变化的弟子id
+
+        规则同Cultivator.check_breakthrough：战力≥2000×2^境界即升一境。
+        """
+        eligible = np.flatnonzero(self.power >= np.ldexp(2000.0, self.stage))
+        self.stage[eligible] += 1
+        self.last_breakthrough[eligible] = np.datetime64(now or datetime.now(), "us")
+        return eligible
+
+    def apply_to(self, tracker, ids):
+        """把指定弟子的新状态写回跟踪系统中的Cultivator对象"""
+        for i in ids:
+            cult = tracker.disciples[self.names[i]]
+            cult._stage = int(self.stage[i])
+            cult.last_breakthrough = str(self.last_breakthrough[i])
+            cult.power = int(self.power[i])  # 赋值战力时会标记为待保存
+
+
+# --------------------------
+# 并发服务
+# --------------------------
+RankEntry = namedtuple("RankEntry", "name stage power")
+
+
+class TrackerService:
+    """线程安全的跟踪服务：写操作进队列，由唯一的写线程批量执行
+
+    每批执行完发布一份不可变的排行快照（RankEntry元组），读操作直接返回当前快照，
+    不需要加锁。数据库连接只在创建服务的线程里使用（启动时全部载入，关闭时保存）。
+    队列有上限：写线程跟不上时提交写操作会阻塞，积压与快照滞后都不会无限增长。
+    """
+
+    def __init__(self, tracker, publish_interval=0.05, batch_size=1000, max_pending=2000):
+        self.tracker = tracker
+        self.publish_interval = publish_interval  # 一批最多攒多久（秒）
+        self.batch_size = batch_size
+        self.published = 0  # 已发布的快照数
+        self.applied = 0  # 已执行的写操作数
+        self.lag_total = 0.0  # 各写操作从提交到出现在快照中的耗时之和（秒）
+        self.max_lag = 0.0  # 其中的最大值（秒）
+        self._queue = queue.Queue(maxsize=max_pending)
+        tracker.disciples.load_all()
+        self._snapshot = self._take_snapshot()
+        self._writer = threading.Thread(target=self._run, daemon=True)
+        self._writer.start()
+
+    # ---------- 读（无锁） ----------
+
+    def power_ranking(self):
+        return self._snapshot
+
+    def top(self, k):
+        return self._snapshot[:k]
+
+    # ---------- 写（入队后立即返回） ----------
+
+    def add_disciple(self, name):
+        self._submit(self.tracker.add_disciple, name)
+
+    def meditate(self, name, hours):
+        self._submit(self._meditate, name, hours)
+
+    def check_breakthroughs(self):
+        self._submit(self.tracker.check_breakthroughs)
+
+    def flush(self):
+        """等待此前提交的写操作全部生效并发布快照"""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self):
+        """停止写线程并保存有变化的弟子"""
+        self._queue.put(None)
+        self._writer.join()
+        self.tracker.save_data()
+
+    # ---------- 写线程 ----------
+
+    def _submit(self, func, *args):
+        self._queue.put((func, args, time.monotonic()))  # 队列已满时阻塞（背压）
+
+    def _meditate(self, name, hours):
+        self.tracker.disciples[name].meditate(hours)
+
+    def _take_snapshot(self):
+        return tuple(
+            RankEntry(c.name, c.current_stage, c.power)
+            for c in self.tracker.power_ranking()
+        )
+
+    def _run(self):
+        running = True
+        while running:
+            ops = [self._queue.get()]
+            deadline = time.monotonic() + self.publish_interval
+            while len(ops) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    ops.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            waiters = []
+            submitted = []  # 本批写操作的提交时间
+            try:
+                for op in ops:
+                    if op is None:
+                        running = False
+                    elif isinstance(op, threading.Event):
+                        waiters.append(op)
+                    else:
+                        func, args, submitted_at = op
+                        submitted.append(submitted_at)
+                        try:
+                            func(*args)
+                        except Exception as e:  # 单个写操作失败不影响写线程
+                            instrumentation.emit(
+                                WARNING,
+                                "写入",
+                                f"{func.__name__}{args} 执行失败：{e!r}",
+                                error=repr(e),
+                            )
+                self._snapshot = self._take_snapshot()
+                self.published += 1
+                if submitted:
+                    now = time.monotonic()
+                    self.applied += len(submitted)
+                    self.lag_total += now * len(submitted) - sum(submitted)
+                    self.max_lag = max(self.max_lag, now - min(submitted))
+            finally:
+                for done in waiters:  # 即使发布失败也不让flush()永远等待
+                    done.set()
+
+
+def benchmark_service(disciples=10000, readers=4, writers=4, seconds=2.0):
+    """读写并发压测：writers个线程不停提交打坐，readers个线程不停读取排行前十
+
+    写入速度按已生效的写操作数除以到flush()返回为止的总耗时计算，不按提交次数。
+    """
+    instrumentation.configure(level=OFF)
+    tracker = CultivationTracker(":memory:")
+    for i in range(disciples):
+        tracker.add_disciple(f"弟子{i}")
+    service = TrackerService(tracker)
+    stop = threading.Event()
+    reads = [0] * readers
+    writes = [0] * writers
+
+    def read(slot):
+        while not stop.is_set():
+            service.top(10)
+            reads[slot] += 1
+
+    def write(slot):
+        rng = random.Random(slot)
+        while not stop.is_set():
+            service.meditate(f"弟子{rng.randrange(disciples)}", rng.randint(1, 4))
+            writes[slot] += 1
+
+    threads = [threading.Thread(target=read, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=write, args=(i,)) for i in range(writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    service.flush()
+    elapsed = time.perf_counter() - started
+    service.close()
+    applied = service.applied
+    print(
+        f"{readers}个读线程 / {writers}个写线程，共{elapsed:.1f}秒："
+        f"读 {sum(reads) / seconds:,.0f} 次/秒，"
+        f"写入生效 {applied:,} 次（提交 {sum(writes):,} 次），{applied / elapsed:,.0f} 次/秒，"
+        f"快照滞后 平均{service.lag_total / max(applied, 1) * 1000:.1f}ms / 最大{service.max_lag * 1000:.1f}ms，"
+        f"发布快照{service.published}次"
+    )
+
+
+# --------------------------
+# 时间步进模拟
+# --------------------------
+def _schedule_of(name, seed):
+    """由弟子名和总种子推出作息 (首次打坐的小时, 间隔小时, 每次打坐小时)，与分片方式无关"""
+    rng = random.Random(f"{seed}:{name}")
+    interval = rng.randint(4, 12)
+    return rng.randrange(interval), interval, rng.randint(1, 4)
+
+
+class SimulationClock:
+    """事件驱动的模拟时钟：打坐事件按到期时刻放进小顶堆，每个时间步处理所有到期事件
+
+    每名弟子始终有一个待处理的打坐事件：运转周天、尝试突破，再按作息排下一次。
+    """
+
+    def __init__(self, cults, start=None, tick_hours=1, seed=0):
+        self.cults = cults
+        self.start = start or datetime.now()
+        self.tick_hours = tick_hours
+        self.hour = 0  # 已模拟的小时数
+        self.breakthroughs = 0
+        self.events = [
+            (offset, i, interval, session)
+            for i, cult in enumerate(cults)
+            for offset, interval, session in [_schedule_of(cult.name, seed)]
+        ]
+        heapq.heapify(self.events)
+
+    @property
+    def now(self):
+        return self.start + timedelta(hours=self.hour)
+
+    def tick(self):
+        """推进一个时间步，处理这段时间内到期的全部事件"""
+        self.hour += self.tick_hours
+        events, cults, now = self.events, self.cults, self.now
+        while events and events[0][0] < self.hour:
+            due, i, interval, session = events[0]
+            cult = cults[i]
+            cult.meditate(session)
+            if cult.check_breakthrough(now):
+                self.breakthroughs += 1
+            heapq.heapreplace(events, (due + interval, i, interval, session))
+
+    def run(self, days):
+        for _ in range(days * 24 // self.tick_hours):
+            self.tick()
+
+
+def simulate_shard(rows, days, start, tick_hours, seed):
+    """在子进程中模拟一片弟子
+
+    rows为 [(名字, 境界, 战力, 上次突破), ...]，返回 (模拟后的同格式列表, 突破次数)。
+    """
+    instrumentation.configure(level=OFF)  # 批量模拟时关闭修炼日志
+    cults = []
+    for name, stage, power, last_breakthrough in rows:
+        cult = Cultivator(name, stage, last_breakthrough)
+        cult.power = power
+        cults.append(cult)
+    clock = SimulationClock(cults, start, tick_hours, seed)
+    clock.run(days)
+    rows = [(c.name, c._stage, c.power, c.last_breakthrough) for c in cults]
+    return rows, clock.breakthroughs
+
+
+def simulate_sect(tracker, days=90, workers=None, tick_hours=1, seed=0, start=None):
+    """把弟子分片交给进程池模拟days天，结束后写回tracker（排行索引随之更新）
+
+    返回 (突破次数, 每秒模拟的弟子·天数)。
+    """
+    rows = [
+        (c.name, c._stage, c.power, c.last_breakthrough)
+        for c in tracker.disciples.values()
+    ]
+    workers = workers or os.cpu_count() or 1
+    shards = [rows[i :: workers * 4] for i in range(workers * 4)]
+    shards = [shard for shard in shards if shard]
+    start = start or datetime.now()
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(workers) as pool:
+        results = list(
+            pool.map(
+                simulate_shard,
+                shards,
+                [days] * len(shards),
+                [start] * len(shards),
+                [tick_hours] * len(shards),
+                [seed] * len(shards),
+            )
+        )
+    elapsed = time.perf_counter() - started
+
+    breakthroughs = 0
+    for shard_rows, count in results:
+        breakthroughs += count
+        for name, stage, power, last_breakthrough in shard_rows:
+            cult = tracker.disciples[name]
+            cult._stage = stage
+            cult.last_breakthrough = last_breakthrough
+            cult.power = power  # 赋值战力时会同步排行索引并标记为待保存
+    rate = len(rows) * days / elapsed
+    print(
+        f"模拟{len(rows)}名弟子{days}天，突破{breakthroughs}次，"
+        f"用时{elapsed:.2f}秒，{rate:,.0f} 弟子·天/秒"
+    )
+    return breakthroughs, rate
+
+
 # 使用示例
-tracker = CultivationTracker()
-tracker.add_disciple("韩立")
-tracker.disciples["韩立"].power = 9800
+if __name__ == "__main__" and sys.argv[1:] == ["bench"]:
+    # python day13-修仙进度跟踪系统.py bench    读写并发压测
+    benchmark_service()
+elif __name__ == "__main__":
+    tracker = CultivationTracker()
+    tracker.add_disciple("韩立")
+    tracker.disciples["韩立"].power = 9800
+
+    print("=== 战力排行榜 ===")
+    for i, cult in enumerate(tracker.power_ranking(), 1):
+        print(f"{i}. {cult.name}: {cult.power}")
+
+    # 模拟外门弟子修炼一个季度
+    instrumentation.configure(level=OFF)
+    for i in range(5000):
+        tracker.add_disciple(f"外门弟子{i}")
+    simulate_sect(tracker, days=90, seed=2025)
 
-print("=== 战力排行榜 ===")
-for i, cult in enumerate(tracker.power_ranking(), 1):
-    print(f"{i}. {cult.name}: {cult.power}")
+    print("=== 模拟后前五名 ===")
+    for i, cult in enumerate(tracker.top(5), 1):
+        print(f"{i}. {cult.name}: 境界{cult.current_stage}，战力{cult.power}")
 
-tracker.save_data()
+    tracker.save_data()
@@ -1,16 +1,49 @@
 class Vector2:
-    """二维坐标类"""
+    """二维向量（__slots__ 省去实例字典；可哈希，可放进集合或作字典键）
+
+    放进集合或作为字典键之后不要再原地修改。
+    """
+
+    __slots__ = ("x", "y")
 
     def __init__(self, x, y):
         self.x = x
         self.y = y
 
+    def set(self, x, y):
+        """原地修改坐标"""
+        self.x = x
+        self.y = y
+        return self
+
     def __add__(self, other):
         return Vector2(self.x + other.x, self.y + other.y)
 
+    def __iadd__(self, other):
+        # 原地相加，不创建新对象
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    def __mul__(self, scalar):
+        return Vector2(self.x * scalar, self.y * scalar)
+
+    def __imul__(self, scalar):
+        self.x *= scalar
+        self.y *= scalar
+        return self
+
     def __eq__(self, other):
+        if not isinstance(other, Vector2):
+            return NotImplemented
         return self.x == other.x and self.y == other.y
 
+    def __hash__(self):
+        return hash((self.x, self.y))
+
+    def __repr__(self):
+        return f"Vector2({self.x}, {self.y})"
+
 
 # 方向常量
 DIRECTIONS = {
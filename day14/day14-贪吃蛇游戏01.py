@@ -1,43 +1,202 @@
 import arcade  # 导入 arcade 库，用于图形渲染和游戏开发
 import random  # 导入 random 库，用于生成随机数
+import sys  # 读取命令行参数
+import time  # 帧耗时测试计时
+from collections import deque  # 双端队列，两端增删都是 O(1)
 
 # 定义一个二维向量类，用于表示位置和方向
+# __slots__ 省去每个实例的字典；可哈希，能放进集合或作字典键
+# 网格坐标用 Vector2.grid(x, y) 从缓存中取，同一格始终是同一个 GridPoint 对象（共享的，不能修改）
+# 普通向量放进集合或作为字典键之后也不要再原地修改
 class Vector2:
+    __slots__ = ("x", "y")
+    _grid_cache = {}  # (x, y) -> 网格坐标
+
     def __init__(self, x, y):
         self.x = x  # x 坐标
         self.y = y  # y 坐标
 
+    # 取网格坐标，缓存中没有时才创建
+    @classmethod
+    def grid(cls, x, y):
+        point = cls._grid_cache.get((x, y))
+        if point is None:
+            point = cls._grid_cache[x, y] = GridPoint(x, y)
+        return point
+
+    # 原地修改坐标
+    def set(self, x, y):
+        self.x = x
+        self.y = y
+        return self
+
     # 定义向量加法运算，使得可以直接相加两个 Vector2 对象
     def __add__(self, other):
         return Vector2(self.x + other.x, self.y + other.y)
 
+    # 原地相加，不创建新对象
+    def __iadd__(self, other):
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    # 向量乘以标量
+    def __mul__(self, scalar):
+        return Vector2(self.x * scalar, self.y * scalar)
+
+    # 原地乘以标量
+    def __imul__(self, scalar):
+        self.x *= scalar
+        self.y *= scalar
+        return self
+
     # 定义等于运算，使得可以比较两个 Vector2 是否相等
     def __eq__(self, other):
+        if not isinstance(other, Vector2):
+            return NotImplemented
         return self.x == other.x and self.y == other.y
 
+    # 与 __eq__ 一致的哈希值
+    def __hash__(self):
+        return hash((self.x, self.y))
+
+    def __repr__(self):
+        return f"Vector2({self.x}, {self.y})"
+
+# 网格坐标：Vector2.grid 缓存中的共享对象，创建后不可修改
+class GridPoint(Vector2):
+    __slots__ = ()
+
+    def __init__(self, x, y):
+        object.__setattr__(self, "x", x)
+        object.__setattr__(self, "y", y)
+
+    # set、+=、*= 等原地修改都会走到这里
+    def __setattr__(self, name, value):
+        raise AttributeError("网格坐标是共享的，不能原地修改")
+
+    def __repr__(self):
+        return f"GridPoint({self.x}, {self.y})"
+
+# 固定步长调度器：累积每帧的时间，按固定步长推进游戏逻辑，不足一步的余数留到下一帧
+# 一帧最多补 max_catch_up 步，再多的时间直接丢弃，避免卡顿后越追越慢
+# alpha 为余下时间占一步的比例，绘制时用来在上一步和当前状态之间插值
+class FixedTimestep:
+    def __init__(self, step, max_catch_up=5):
+        self.step = step  # 每步的时长（秒）
+        self.max_catch_up = max_catch_up  # 每帧最多执行的步数
+        self.accumulator = 0.0  # 尚未模拟的时间
+        self.ticks = 0  # 已执行的步数
+        self.dropped_time = 0.0  # 因追赶上限丢弃的时间
+        self.tick_time_total = 0.0  # 所有步的逻辑耗时之和
+        self.tick_time_max = 0.0  # 单步逻辑耗时的最大值
+
+    # 累积 delta_time 并执行到期的步，返回本帧执行的步数
+    def advance(self, delta_time, tick):
+        self.accumulator += delta_time
+        steps = 0
+        while self.accumulator >= self.step:
+            if steps == self.max_catch_up:
+                remainder = self.accumulator % self.step
+                self.dropped_time += self.accumulator - remainder
+                self.accumulator = remainder
+                break
+            started = time.perf_counter()
+            tick()
+            elapsed = time.perf_counter() - started
+            self.tick_time_total += elapsed
+            self.tick_time_max = max(self.tick_time_max, elapsed)
+            self.ticks += 1
+            self.accumulator -= self.step
+            steps += 1
+        return steps
+
+    # 插值系数（0~1）
+    @property
+    def alpha(self):
+        return self.accumulator / self.step
+
+    # 每步逻辑耗时等统计
+    def metrics(self):
+        return {
+            "ticks": self.ticks,
+            "mean_tick_ms": self.tick_time_total / self.ticks * 1000 if self.ticks else 0.0,
+            "max_tick_ms": self.tick_time_max * 1000,
+            "dropped_seconds": self.dropped_time,
+        }
+
 # 方向字典，存储上下左右移动的单位向量
 DIRECTIONS = {
-    "up": Vector2(0, 1),     # 向上移动
-    "down": Vector2(0, -1),  # 向下移动
-    "left": Vector2(-1, 0),  # 向左移动
-    "right": Vector2(1, 0),  # 向右移动
+    "up": Vector2.grid(0, 1),     # 向上移动
+    "down": Vector2.grid(0, -1),  # 向下移动
+    "left": Vector2.grid(-1, 0),  # 向左移动
+    "right": Vector2.grid(1, 0),  # 向右移动
 }
 
+# 占用网格：记录每个格子上有几节蛇身，并维护空闲格子列表
+class OccupancyGrid:
+    def __init__(self, width, height):
+        self.width = width  # 网格宽度
+        self.height = height  # 网格高度
+        self.counts = [0] * (width * height)  # 每个格子上的蛇身节数
+        self.free = list(range(width * height))  # 空闲格子的下标
+        self.slots = list(range(width * height))  # 每个格子在 free 中的位置
+
+    # 格子下标，超出边界时返回 None（出界的位置不记录）
+    def _index(self, pos):
+        if 0 <= pos.x < self.width and 0 <= pos.y < self.height:
+            return pos.y * self.width + pos.x
+        return None
+
+    # 格子上的蛇身节数，O(1)
+    def occupancy(self, pos):
+        i = self._index(pos)
+        return 0 if i is None else self.counts[i]
+
+    # 一节蛇身进入格子：格子由空变满时，用末尾元素填补它在 free 中的位置（O(1)）
+    def add(self, pos):
+        i = self._index(pos)
+        if i is None:
+            return
+        if self.counts[i] == 0:
+            slot, last = self.slots[i], self.free[-1]
+            self.free[slot], self.slots[last] = last, slot
+            self.free.pop()
+        self.counts[i] += 1
+
+    # 一节蛇身离开格子：格子变空时放回 free 末尾
+    def remove(self, pos):
+        i = self._index(pos)
+        if i is None:
+            return
+        self.counts[i] -= 1
+        if self.counts[i] == 0:
+            self.slots[i] = len(self.free)
+            self.free.append(i)
+
+    # 直接从空闲格子中随机取一个，棋盘已满时返回 None
+    def random_free(self):
+        if not self.free:
+            return None
+        i = random.choice(self.free)
+        return Vector2.grid(i % self.width, i // self.width)
+
 # 游戏状态类，存储蛇的位置、方向、食物等信息
 class GameState:
     def __init__(self, width=20, height=20):
-        self.snake = [Vector2(5, 5)]  # 初始化蛇的位置，初始长度为 1
+        self.width = width  # 网格宽度
+        self.height = height  # 网格高度
+        self.snake = deque([Vector2.grid(5, 5)])  # 初始化蛇的位置，初始长度为 1（队尾是蛇头）
+        self.grid = OccupancyGrid(width, height)  # 蛇身占用的格子
+        self.grid.add(self.snake[0])
         self.direction = DIRECTIONS["right"]  # 初始方向向右
         self.food = self._generate_food()  # 生成食物
         self.score = 0  # 分数
         self.game_over = False  # 游戏是否结束的标志
 
-    # 生成食物，确保食物不会出现在蛇身上
+    # 生成食物：直接从空闲格子中抽取，不会出现在蛇身上
     def _generate_food(self):
-        while True:
-            new_food = Vector2(random.randint(0, 19), random.randint(0, 19))  # 在 0-19 范围内随机生成食物位置
-            if new_food not in self.snake:  # 确保食物不会出现在蛇身上
-                return new_food
+        return self.grid.random_free()
 
 # 贪吃蛇游戏窗口类，继承自 arcade.Window
 class SnakeGame(arcade.Window):
@@ -49,31 +208,60 @@ class SnakeGame(arcade.Window):
         
         # 控制蛇的移动速度（单位：秒）
         self.move_interval = 0.2  # 每 0.2 秒移动一次
-        self.time_since_last_move = 0.0  # 记录距离上次移动的时间
+        self.timestep = FixedTimestep(self.move_interval)  # 按固定步长移动，余下的时间留到下一帧
+        self.prev_head = self.game.snake[-1]  # 上一步的蛇头位置（用于插值绘制）
+
+        # 蛇身精灵：与蛇身一一对应，整条蛇一次绘制；移动时只把尾部精灵挪到新蛇头处
+        self.snake_sprites = arcade.SpriteList()
+        self.segment_sprites = deque()  # 按蛇身顺序排列的精灵（队尾对应蛇头）
+        self._rebuild_sprites()
+
+    # 蛇身格子的绘制位置（与原先逐节绘制矩形的位置相同）
+    def _cell_position(self, segment):
+        return segment.x * self.cell_size + 1, segment.y * self.cell_size + 1
+
+    # 在蛇头处新增一个精灵（蛇变长时使用）
+    def _add_segment_sprite(self, segment):
+        sprite = arcade.SpriteSolidColor(
+            self.cell_size - 2, self.cell_size - 2, color=arcade.color.GREEN  # 设置蛇的颜色为绿色
+        )
+        sprite.position = self._cell_position(segment)
+        self.snake_sprites.append(sprite)
+        self.segment_sprites.append(sprite)
+
+    # 按当前蛇身重新创建全部精灵
+    def _rebuild_sprites(self):
+        self.snake_sprites.clear()
+        self.segment_sprites.clear()
+        for segment in self.game.snake:
+            self._add_segment_sprite(segment)
+
+    # 把蛇头精灵放到上一步与当前位置之间（蛇头只移动了一格时才插值）
+    def _interpolate_head(self):
+        head, prev = self.game.snake[-1], self.prev_head
+        if abs(head.x - prev.x) + abs(head.y - prev.y) != 1:
+            return
+        alpha = self.timestep.alpha
+        x0, y0 = self._cell_position(prev)
+        x1, y1 = self._cell_position(head)
+        self.segment_sprites[-1].position = (x0 + (x1 - x0) * alpha, y0 + (y1 - y0) * alpha)
 
     # 绘制游戏内容
     def on_draw(self):
         self.clear()  # 清除屏幕
 
-        # 绘制蛇的每个身体部分
-        for segment in self.game.snake:
-            arcade.draw_rect_filled(
-                arcade.rect.XYWH(
-                    segment.x * self.cell_size + 1,  # 计算绘制的 x 坐标
-                    segment.y * self.cell_size + 1,  # 计算绘制的 y 坐标
-                    self.cell_size - 2,  # 宽度
-                    self.cell_size - 2   # 高度
-                ),
-                arcade.color.GREEN  # 设置蛇的颜色为绿色
-            )
+        # 绘制整条蛇（一次绘制调用），蛇头在上一步和当前位置之间插值
+        self._interpolate_head()
+        self.snake_sprites.draw()
 
         # 绘制食物
-        arcade.draw_circle_filled(
-            self.game.food.x * self.cell_size + self.cell_size // 2,  # 计算食物的 x 坐标
-            self.game.food.y * self.cell_size + self.cell_size // 2,  # 计算食物的 y 坐标
-            self.cell_size // 2 - 2,  # 计算食物的半径
-            arcade.color.RED  # 设置食物的颜色为红色
-        )
+        if self.game.food is not None:
+            arcade.draw_circle_filled(
+                self.game.food.x * self.cell_size + self.cell_size // 2,  # 计算食物的 x 坐标
+                self.game.food.y * self.cell_size + self.cell_size // 2,  # 计算食物的 y 坐标
+                self.cell_size // 2 - 2,  # 计算食物的半径
+                arcade.color.RED  # 设置食物的颜色为红色
+            )
 
         # 显示分数
         arcade.draw_text(
@@ -86,31 +274,42 @@ class SnakeGame(arcade.Window):
     # 游戏逻辑更新，每帧调用一次
     def on_update(self, delta_time):
         if not self.game.game_over:  # 只有在游戏未结束时才更新
-            self.time_since_last_move += delta_time  # 累积时间
-            
-            # 只有当累计时间超过移动间隔时才进行移动
-            if self.time_since_last_move >= self.move_interval:
-                self.time_since_last_move = 0.0  # 重置计时器
-                self._move_snake()  # 移动蛇
-                self._check_collisions()  # 检查碰撞
+            self.timestep.advance(delta_time, self._tick)  # 按固定步长移动（可能补走几步）
+
+    # 游戏逻辑走一步
+    def _tick(self):
+        if self.game.game_over:  # 同一帧内补走时，游戏可能已经结束
+            return
+        self.prev_head = self.game.snake[-1]
+        self.segment_sprites[-1].position = self._cell_position(self.prev_head)  # 撤销插值偏移
+        self._move_snake()  # 移动蛇
+        self._check_collisions()  # 检查碰撞
 
     # 移动蛇
     def _move_snake(self):
-        new_head = self.game.snake[-1] + self.game.direction  # 计算新的蛇头位置
+        head, direction = self.game.snake[-1], self.game.direction
+        new_head = Vector2.grid(head.x + direction.x, head.y + direction.y)  # 计算新的蛇头位置（取自缓存，不新建对象）
         self.game.snake.append(new_head)  # 将新的头部添加到蛇身
+        self.game.grid.add(new_head)  # 登记蛇头占用的格子
 
         if new_head == self.game.food:  # 如果蛇吃到了食物
             self.game.score += 1  # 分数加 1
             self.game.food = self.game._generate_food()  # 生成新的食物
+            if self.game.food is None:  # 蛇已占满棋盘
+                self.game.game_over = True
+            self._add_segment_sprite(new_head)  # 蛇变长，新增一个精灵
         else:
-            self.game.snake.pop(0)  # 如果没有吃到食物，则移除蛇尾（保持长度）
+            self.game.grid.remove(self.game.snake.popleft())  # 如果没有吃到食物，则移除蛇尾（保持长度）
+            sprite = self.segment_sprites.popleft()  # 回收蛇尾精灵，挪到新蛇头处
+            sprite.position = self._cell_position(new_head)
+            self.segment_sprites.append(sprite)
 
     # 检查蛇是否撞墙或咬到自己
     def _check_collisions(self):
         head = self.game.snake[-1]  # 获取蛇头位置
-        if not (0 <= head.x < 20 and 0 <= head.y < 20):  # 检查是否超出边界
+        if not (0 <= head.x < self.game.width and 0 <= head.y < self.game.height):  # 检查是否超出边界
             self.game.game_over = True  # 结束游戏
-        if head in self.game.snake[:-1]:  # 检查是否咬到自己
+        elif self.game.grid.occupancy(head) > 1:  # 蛇头所在格子还有别的蛇身，说明咬到自己
             self.game.game_over = True  # 结束游戏
 
     # 处理键盘输入
@@ -128,7 +327,50 @@ class SnakeGame(arcade.Window):
         elif key == arcade.key.RIGHT and self.game.direction != DIRECTIONS["left"]:
             self.game.direction = DIRECTIONS["right"]
 
+# 按行往返排布的蛇身（用于帧耗时测试），最后一格为蛇头
+def serpentine_body(length, width=20):
+    cells = []
+    for y in range(length // width + 1):
+        xs = range(width) if y % 2 == 0 else range(width - 1, -1, -1)
+        cells.extend(Vector2.grid(x, y) for x in xs)
+    return cells[:length]
+
+# 帧耗时测试：分别用 SpriteList 和逐节绘制画出不同长度的蛇，比较平均每帧耗时
+def benchmark_frames(lengths=(10, 100, 400), frames=300):
+    game = SnakeGame()
+    for length in lengths:
+        game.game.snake = deque(serpentine_body(length))
+        game._rebuild_sprites()
+        game.prev_head = game.game.snake[-1]
+
+        started = time.perf_counter()
+        for _ in range(frames):
+            game.on_draw()
+            game.ctx.finish()  # 等待显卡画完
+        sprite_time = (time.perf_counter() - started) / frames
+
+        started = time.perf_counter()
+        for _ in range(frames):
+            game.clear()
+            for segment in game.game.snake:
+                x, y = game._cell_position(segment)
+                arcade.draw_rect_filled(
+                    arcade.rect.XYWH(x, y, game.cell_size - 2, game.cell_size - 2),
+                    arcade.color.GREEN
+                )
+            game.ctx.finish()
+        immediate_time = (time.perf_counter() - started) / frames
+
+        print(f"蛇长 {length}：SpriteList {sprite_time * 1000:.3f} 毫秒/帧，"
+              f"逐节绘制 {immediate_time * 1000:.3f} 毫秒/帧")
+    game.close()
+
 # 运行游戏
 if __name__ == "__main__":
-    game = SnakeGame()  # 创建游戏窗口
-    arcade.run()  # 运行游戏
+    # python day14-贪吃蛇游戏01.py          开始游戏
+    # python day14-贪吃蛇游戏01.py bench    帧耗时测试
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        benchmark_frames()
+    else:
+        game = SnakeGame()  # 创建游戏窗口
+        arcade.run()  # 运行游戏
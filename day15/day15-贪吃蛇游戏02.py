@@ -1,62 +1,238 @@
 # 导入必要的库
 import arcade  # 游戏开发库
 import random  # 随机数生成
-from typing import List  # 类型提示支持
+import sys  # 命令行参数
+import time  # 帧耗时测试计时
+from collections import Counter, deque  # 出界格计数、双端队列（头尾增删O(1)）
+from typing import Deque, List, Optional  # 类型提示支持
 
 # ----------------------
 # 基础类定义
 # ----------------------
 class Vector2:
-    """二维坐标类"""
-    def __init__(self, x: int, y: int):
+    """二维向量（__slots__ 省去实例字典；可哈希，可放进集合或作字典键）
+
+    网格坐标用 Vector2.grid(x, y) 从缓存取得，同一格始终是同一个GridPoint对象，不会重复创建；
+    GridPoint是共享的，不能修改。普通向量放进集合或作为字典键之后也不要再原地修改。
+    """
+
+    __slots__ = ("x", "y")
+    _grid_cache = {}  # (x, y) -> 网格坐标
+
+    def __init__(self, x, y):
         self.x = x  # x坐标
         self.y = y  # y坐标
 
+    @classmethod
+    def grid(cls, x, y):
+        """取网格坐标（缓存中没有时才创建）"""
+        point = cls._grid_cache.get((x, y))
+        if point is None:
+            point = cls._grid_cache[x, y] = GridPoint(x, y)
+        return point
+
+    def set(self, x, y):
+        """原地修改坐标"""
+        self.x = x
+        self.y = y
+        return self
+
     def __add__(self, other):
-        """向量加法"""
         return Vector2(self.x + other.x, self.y + other.y)
-    
+
+    def __iadd__(self, other):
+        # 原地相加，不创建新对象
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    def __mul__(self, scalar):
+        return Vector2(self.x * scalar, self.y * scalar)
+
+    def __imul__(self, scalar):
+        self.x *= scalar
+        self.y *= scalar
+        return self
+
+    def __mod__(self, value):
+        """用于实现循环边界（取模运算），结果为网格坐标"""
+        return Vector2.grid(self.x % value, self.y % value)
+
     def __eq__(self, other):
-        """等值比较"""
+        if not isinstance(other, Vector2):
+            return NotImplemented
         return self.x == other.x and self.y == other.y
-    
-    def __mod__(self, value):
-        """用于实现循环边界（取模运算）"""
-        return Vector2(self.x % value, self.y % value)
+
+    def __hash__(self):
+        return hash((self.x, self.y))
+
+    def __repr__(self):
+        return f"Vector2({self.x}, {self.y})"
+
+
+class GridPoint(Vector2):
+    """网格坐标（Vector2.grid 缓存中的共享对象），创建后不可修改"""
+
+    __slots__ = ()
+
+    def __init__(self, x, y):
+        object.__setattr__(self, "x", x)
+        object.__setattr__(self, "y", y)
+
+    def __setattr__(self, name, value):
+        # set、+=、*= 等原地修改都会走到这里
+        raise AttributeError("网格坐标是共享的，不能原地修改")
+
+    def __repr__(self):
+        return f"GridPoint({self.x}, {self.y})"
+
+
+class FixedTimestep:
+    """固定步长调度器（累积帧时间按固定步长推进逻辑，不足一步的余数留到下一帧）
+
+    一帧最多补max_catch_up步，再多的时间直接丢弃，避免卡顿后越追越慢；
+    alpha为余下时间占一步的比例，绘制时用于在上一步和当前状态之间插值。
+    """
+    def __init__(self, step: float, max_catch_up: int = 5):
+        self.step = step  # 每步时长（秒）
+        self.max_catch_up = max_catch_up  # 每帧最多执行的步数
+        self.accumulator = 0.0  # 尚未模拟的时间
+        self.ticks = 0  # 已执行的步数
+        self.dropped_time = 0.0  # 因追赶上限丢弃的时间
+        self.tick_time_total = 0.0  # 所有步的逻辑耗时之和
+        self.tick_time_max = 0.0  # 单步逻辑耗时最大值
+
+    def advance(self, delta_time: float, tick) -> int:
+        """累积delta_time并执行到期的步，返回本帧执行的步数"""
+        self.accumulator += delta_time
+        steps = 0
+        while self.accumulator >= self.step:
+            if steps == self.max_catch_up:
+                remainder = self.accumulator % self.step
+                self.dropped_time += self.accumulator - remainder
+                self.accumulator = remainder
+                break
+            started = time.perf_counter()
+            tick()
+            elapsed = time.perf_counter() - started
+            self.tick_time_total += elapsed
+            self.tick_time_max = max(self.tick_time_max, elapsed)
+            self.ticks += 1
+            self.accumulator -= self.step
+            steps += 1
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        """插值系数（0~1）"""
+        return self.accumulator / self.step
+
+    def metrics(self) -> dict:
+        """每步逻辑耗时等统计"""
+        return {
+            "ticks": self.ticks,
+            "mean_tick_ms": self.tick_time_total / self.ticks * 1000 if self.ticks else 0.0,
+            "max_tick_ms": self.tick_time_max * 1000,
+            "dropped_seconds": self.dropped_time,
+        }
 
 # 方向常量字典（使用Vector2表示方向向量）
 DIRECTIONS = {
-    "up": Vector2(0, 1),     # 上
-    "down": Vector2(0, -1),  # 下
-    "left": Vector2(-1, 0),  # 左
-    "right": Vector2(1, 0)    # 右
+    "up": Vector2.grid(0, 1),     # 上
+    "down": Vector2.grid(0, -1),  # 下
+    "left": Vector2.grid(-1, 0),  # 左
+    "right": Vector2.grid(1, 0)    # 右
 }
 
+# ----------------------
+# 占用网格
+# ----------------------
+class OccupancyGrid:
+    """占用网格（记录每格蛇身节数，并维护空闲格列表）"""
+    def __init__(self, width: int, height: int):
+        self.width = width  # 网格宽度
+        self.height = height  # 网格高度
+        self.counts = [0] * (width * height)  # 每格上的蛇身节数
+        self.free = list(range(width * height))  # 空闲格下标
+        self.slots = list(range(width * height))  # 每格在free中的位置
+        self.overflow = Counter()  # 出界位置上的蛇身节数（不撞墙的蛇出界后仍可能撞到自己）
+
+    def _index(self, pos: Vector2) -> Optional[int]:
+        """格子下标（出界返回None，出界位置记在overflow中）"""
+        if 0 <= pos.x < self.width and 0 <= pos.y < self.height:
+            return pos.y * self.width + pos.x
+        return None
+
+    def occupancy(self, pos: Vector2) -> int:
+        """格子上的蛇身节数（O(1)）"""
+        i = self._index(pos)
+        return self.overflow[pos] if i is None else self.counts[i]
+
+    def add(self, pos: Vector2):
+        """蛇身进入格子（格子由空变满时，用free末尾元素填补空位，O(1)）"""
+        i = self._index(pos)
+        if i is None:
+            self.overflow[pos] += 1
+            return
+        if self.counts[i] == 0:
+            slot, last = self.slots[i], self.free[-1]
+            self.free[slot], self.slots[last] = last, slot
+            self.free.pop()
+        self.counts[i] += 1
+
+    def remove(self, pos: Vector2):
+        """蛇身离开格子（格子变空时放回free末尾）"""
+        i = self._index(pos)
+        if i is None:
+            self.overflow[pos] -= 1
+            if not self.overflow[pos]:
+                del self.overflow[pos]
+            return
+        self.counts[i] -= 1
+        if self.counts[i] == 0:
+            self.slots[i] = len(self.free)
+            self.free.append(i)
+
+    def random_free(self) -> Optional[Vector2]:
+        """从空闲格中直接抽取（棋盘已满返回None）"""
+        if not self.free:
+            return None
+        i = random.choice(self.free)
+        return Vector2.grid(i % self.width, i // self.width)
+
 # ----------------------
 # 蛇类继承体系
 # ----------------------
 class BaseSnake:
     """蛇基类（所有蛇类的共同行为）"""
-    def __init__(self, start_pos: Vector2):
-        self.body: List[Vector2] = [start_pos]  # 身体坐标列表
+    def __init__(self, start_pos: Vector2, grid_size: int = 20):
+        self.body: Deque[Vector2] = deque([start_pos])  # 身体坐标队列（队尾为头部）
+        self.grid = OccupancyGrid(grid_size, grid_size)  # 身体占用的格子
+        self.grid.add(start_pos)
         self.direction: Vector2 = DIRECTIONS["right"]  # 初始方向向右
         self.grow_counter = 0  # 生长计数器（记录需要生长的节数）
     
+    def next_head(self) -> Vector2:
+        """下一步的头部位置（子类可重写）"""
+        head, direction = self.body[-1], self.direction
+        return Vector2.grid(head.x + direction.x, head.y + direction.y)  # 取自缓存，不新建对象
+    
     def move(self):
         """基础移动逻辑（所有蛇类共用）"""
-        new_head = self.body[-1] + self.direction  # 计算新头部位置
+        new_head = self.next_head()  # 计算新头部位置
         self.body.append(new_head)  # 将新头部添加到身体
+        self.grid.add(new_head)  # 登记头部占用的格子
         
         # 根据生长计数器判断是否缩短尾部
         if self.grow_counter > 0:
             self.grow_counter -= 1
         else:
-            self.body.pop(0)  # 移除尾部保持长度
+            self.grid.remove(self.body.popleft())  # 移除尾部保持长度
     
     def check_collision(self, grid_size: int) -> bool:
         """碰撞检测（子类可重写）返回是否碰撞自身"""
         head = self.body[-1]  # 获取头部位置
-        return head in self.body[:-1]  # 检查头部是否在身体其他部分
+        return self.grid.occupancy(head) > 1  # 头部所在格还有其他身体节
     
     def grow(self, amount: int = 1):
         """生长机制（延长蛇身）"""
@@ -64,24 +240,25 @@ class BaseSnake:
 
 class TeleportSnake(BaseSnake):
     """瞬移蛇（穿越边界实现循环地图）"""
-    def move(self):
-        """重写移动方法实现边界穿越"""
-        super().move()  # 先执行基础移动
-        head = self.body[-1]  # 获取移动后的头部
-        self.body[-1] = head % 20  # 对坐标取模实现循环边界（假设20x20网格）
+    def next_head(self) -> Vector2:
+        """重写头部位置计算实现边界穿越"""
+        return super().next_head() % self.grid.width  # 对坐标取模实现循环边界
 
 class SplitSnake(BaseSnake):
     """分身蛇（可分裂身体）"""
-    def __init__(self, start_pos: Vector2):
-        super().__init__(start_pos)
+    def __init__(self, start_pos: Vector2, grid_size: int = 20):
+        super().__init__(start_pos, grid_size)
         self.children: List[List[Vector2]] = []  # 存储所有分身身体的列表
     
     def split(self):
         """分裂身体创建分身"""
         if len(self.body) >= 4:  # 至少4节才能分裂
-            split_point = len(self.body) // 2  # 计算分裂点（取中间）
-            new_body = self.body[split_point:]  # 后半部分作为分身
-            self.body = self.body[:split_point]  # 保留前半部分作为本体
+            body = list(self.body)
+            split_point = len(body) // 2  # 计算分裂点（取中间）
+            new_body = body[split_point:]  # 后半部分作为分身
+            self.body = deque(body[:split_point])  # 保留前半部分作为本体
+            for seg in new_body:
+                self.grid.remove(seg)  # 分身不再占用本体的格子
             self.children.append(new_body)  # 将分身添加到列表
     
     def update_children(self):
@@ -100,53 +277,110 @@ class AdvancedSnakeGame(arcade.Window):
         super().__init__(800, 600, "灵蛇进化录")
         self.grid_size = 20  # 网格尺寸（20x20）
         self.cell_size = 30  # 每个网格的像素大小
-        self.snake: BaseSnake = TeleportSnake(Vector2(10, 10))  # 创建瞬移蛇实例（初始位置中心）
+        self.snake: BaseSnake = TeleportSnake(Vector2.grid(10, 10), self.grid_size)  # 创建瞬移蛇实例（初始位置中心）
         self.food = self.generate_food()  # 生成食物
         self.score = 0  # 玩家得分
         self.game_over = False  # 游戏结束标志
         
         # 移动时间控制相关
         self.move_interval = 0.15  # 移动间隔（秒）
-        self.time_since_move = 0.0  # 累计时间
+        self.timestep = FixedTimestep(self.move_interval)  # 固定步长调度（余数留到下一帧）
+        self.prev_head = self.snake.body[-1]  # 上一步的头部位置（用于插值绘制）
+        
+        # 蛇身精灵：按身体节的序号奇偶分到两个列表，颜色设在列表上
+        # 移动时只增删头尾两个精灵，交替配色靠每步交换两个列表的颜色实现
+        self.parity_sprites = (arcade.SpriteList(), arcade.SpriteList())
+        self.parity_pools = ([], [])  # 已隐藏、可复用的精灵
+        self.segment_sprites: Deque[arcade.SpriteSolidColor] = deque()  # 与身体一一对应
+        self.head_seq = -1  # 头部节的序号（每长出一节加一）
+        self.tail_seq = 0  # 尾部节的序号
+        self._rebuild_sprites()
         
         arcade.set_background_color(arcade.color.BLACK)  # 设置背景颜色
 
-    def generate_food(self) -> Vector2:
-        """生成不在蛇身上的随机食物位置"""
-        while True:
-            # 随机生成坐标（0到19之间）
-            pos = Vector2(random.randint(0,19), random.randint(0,19))
-            if pos not in self.snake.body:  # 确保食物不在蛇身上
-                return pos
+    def generate_food(self) -> Optional[Vector2]:
+        """生成不在蛇身上的随机食物位置（直接从空闲格中抽取）"""
+        return self.snake.grid.random_free()
+
+    def _cell_position(self, seg: Vector2):
+        """身体节的绘制位置（留1像素边距，与逐节绘制矩形时相同）"""
+        return seg.x * self.cell_size + 1, seg.y * self.cell_size + 1
+
+    def _push_head_sprite(self, seg: Vector2):
+        """为新头部取一个精灵（优先复用同奇偶的隐藏精灵）"""
+        self.head_seq += 1
+        parity = self.head_seq % 2
+        pool = self.parity_pools[parity]
+        if pool:
+            sprite = pool.pop()
+            sprite.visible = True
+        else:
+            # 精灵本身为白色，实际颜色由所在列表的颜色相乘得到
+            sprite = arcade.SpriteSolidColor(self.cell_size - 2, self.cell_size - 2, color=arcade.color.WHITE)
+            self.parity_sprites[parity].append(sprite)
+        sprite.position = self._cell_position(seg)
+        self.segment_sprites.append(sprite)
+
+    def _pop_tail_sprite(self):
+        """隐藏尾部精灵并放回对应奇偶的池中"""
+        sprite = self.segment_sprites.popleft()
+        sprite.visible = False
+        self.parity_pools[self.tail_seq % 2].append(sprite)
+        self.tail_seq += 1
+
+    def _update_sprite_colors(self):
+        """从尾部数起第偶数节为GREEN、奇数节为LIME_GREEN（同逐节绘制时的配色）"""
+        tail = self.tail_seq % 2
+        self.parity_sprites[tail].color = arcade.color.GREEN
+        self.parity_sprites[1 - tail].color = arcade.color.LIME_GREEN
+
+    def _sync_sprites(self):
+        """蛇移动后增量更新：加上新头部，去掉多出的尾部"""
+        self._push_head_sprite(self.snake.body[-1])
+        while len(self.segment_sprites) > len(self.snake.body):
+            self._pop_tail_sprite()
+        self._update_sprite_colors()
+
+    def _rebuild_sprites(self):
+        """身体整体变化时（开局、分裂）重建全部精灵"""
+        for sprites in self.parity_sprites:
+            sprites.clear()
+        for pool in self.parity_pools:
+            pool.clear()
+        self.segment_sprites.clear()
+        self.head_seq, self.tail_seq = -1, 0
+        for seg in self.snake.body:
+            self._push_head_sprite(seg)
+        self._update_sprite_colors()
+
+    def _interpolate_head(self):
+        """把头部精灵放到上一步与当前位置之间（穿越边界的那一步不插值）"""
+        head, prev = self.snake.body[-1], self.prev_head
+        if abs(head.x - prev.x) + abs(head.y - prev.y) != 1:
+            return
+        alpha = self.timestep.alpha
+        x0, y0 = self._cell_position(prev)
+        x1, y1 = self._cell_position(head)
+        self.segment_sprites[-1].position = (x0 + (x1 - x0) * alpha, y0 + (y1 - y0) * alpha)
 
     def on_draw(self):
         """绘制游戏画面（每帧自动调用）"""
         self.clear()  # 清空画面
         
         # 绘制食物（红色圆形）
-        arcade.draw_circle_filled(
-            self.food.x * self.cell_size + self.cell_size//2,  # 计算x屏幕坐标
-            self.food.y * self.cell_size + self.cell_size//2,  # 计算y屏幕坐标
-            self.cell_size//2 - 2,  # 半径（留2像素边距）
-            arcade.color.RED  # 颜色
-        )
-        
-        # 绘制主蛇身体（交替颜色实现流光效果）
-        for i, seg in enumerate(self.snake.body):
-            # 交替使用两种绿色
-            color = arcade.color.GREEN if i%2==0 else arcade.color.LIME_GREEN
-            # 绘制矩形代表蛇身节
-            arcade.draw_rect_filled(
-                # 创建矩形参数（XYWH格式）
-                arcade.rect.XYWH(
-                    seg.x * self.cell_size + 1,  # 计算x位置（留1像素边距）
-                    seg.y * self.cell_size + 1,  # 计算y位置
-                    self.cell_size - 2,  # 宽度
-                    self.cell_size - 2  # 高度
-                ),
-                color  # 填充颜色
+        if self.food is not None:
+            arcade.draw_circle_filled(
+                self.food.x * self.cell_size + self.cell_size//2,  # 计算x屏幕坐标
+                self.food.y * self.cell_size + self.cell_size//2,  # 计算y屏幕坐标
+                self.cell_size//2 - 2,  # 半径（留2像素边距）
+                arcade.color.RED  # 颜色
             )
         
+        # 绘制主蛇身体（交替颜色实现流光效果，每个列表一次绘制；头部插值）
+        self._interpolate_head()
+        for sprites in self.parity_sprites:
+            sprites.draw()
+        
         # 如果使用分身蛇，绘制分身身体
         if isinstance(self.snake, SplitSnake):
             for child in self.snake.children:  # 遍历所有分身
@@ -167,21 +401,28 @@ class AdvancedSnakeGame(arcade.Window):
         if self.game_over:
             return  # 游戏结束停止更新
         
-        self.time_since_move += delta_time  # 累计时间
-        # 达到移动间隔时执行移动
-        if self.time_since_move >= self.move_interval:
-            self.time_since_move = 0  # 重置计时器
-            self.snake.move()  # 移动蛇
-            
-            # 检测是否吃到食物
-            if self.snake.body[-1] == self.food:
-                self.score += 1  # 增加分数
-                self.snake.grow(3)  # 生长3节
-                self.food = self.generate_food()  # 生成新食物
-            
-            # 检测碰撞（调用蛇类的碰撞检测方法）
-            if self.snake.check_collision(self.grid_size):
-                self.game_over = True  # 触发游戏结束
+        self.timestep.advance(delta_time, self._tick)  # 按固定步长移动（可能补走几步）
+
+    def _tick(self):
+        """游戏逻辑走一步"""
+        if self.game_over:
+            return  # 同一帧内补走时游戏可能已经结束
+        self.prev_head = self.snake.body[-1]
+        self.segment_sprites[-1].position = self._cell_position(self.prev_head)  # 撤销插值偏移
+        self.snake.move()  # 移动蛇
+        self._sync_sprites()  # 同步蛇身精灵
+        
+        # 检测是否吃到食物
+        if self.snake.body[-1] == self.food:
+            self.score += 1  # 增加分数
+            self.snake.grow(3)  # 生长3节
+            self.food = self.generate_food()  # 生成新食物
+            if self.food is None:  # 蛇已占满棋盘
+                self.game_over = True
+        
+        # 检测碰撞（调用蛇类的碰撞检测方法）
+        if self.snake.check_collision(self.grid_size):
+            self.game_over = True  # 触发游戏结束
 
     def on_key_press(self, key: int, modifiers: int):
         """键盘按下事件处理"""
@@ -201,8 +442,54 @@ class AdvancedSnakeGame(arcade.Window):
         # 空格键触发分身分裂（仅SplitSnake有效）
         if key == arcade.key.SPACE and isinstance(self.snake, SplitSnake):
             self.snake.split()  # 调用分裂方法
+            self._rebuild_sprites()  # 身体整体变化，重建精灵
+            self.prev_head = self.snake.body[-1]
+
+# ----------------------
+# 帧耗时测试
+# ----------------------
+def serpentine_body(length: int, width: int = 20) -> List[Vector2]:
+    """按行往返排布的蛇身（最后一格为头部）"""
+    cells = []
+    for y in range(length // width + 1):
+        xs = range(width) if y % 2 == 0 else range(width - 1, -1, -1)
+        cells.extend(Vector2.grid(x, y) for x in xs)
+    return cells[:length]
+
+def benchmark_frames(lengths=(10, 100, 400), frames: int = 300):
+    """分别用SpriteList和逐节绘制画出不同长度的蛇，比较平均每帧耗时"""
+    game = AdvancedSnakeGame()
+    for length in lengths:
+        game.snake.body = deque(serpentine_body(length, game.grid_size))
+        game._rebuild_sprites()
+        game.prev_head = game.snake.body[-1]
+
+        started = time.perf_counter()
+        for _ in range(frames):
+            game.on_draw()
+            game.ctx.finish()  # 等待显卡画完
+        sprite_time = (time.perf_counter() - started) / frames
+
+        started = time.perf_counter()
+        for _ in range(frames):
+            game.clear()
+            for i, seg in enumerate(game.snake.body):
+                x, y = game._cell_position(seg)
+                color = arcade.color.GREEN if i%2==0 else arcade.color.LIME_GREEN
+                arcade.draw_rect_filled(arcade.rect.XYWH(x, y, game.cell_size - 2, game.cell_size - 2), color)
+            game.ctx.finish()
+        immediate_time = (time.perf_counter() - started) / frames
+
+        print(f"蛇长{length}：SpriteList {sprite_time * 1000:.3f} 毫秒/帧，"
+              f"逐节绘制 {immediate_time * 1000:.3f} 毫秒/帧")
+    game.close()
 
 # 程序入口
 if __name__ == "__main__":
-    game = AdvancedSnakeGame()  # 创建游戏实例
-    arcade.run()  # 运行游戏循环
\ No newline at end of file
+    # python day15-贪吃蛇游戏02.py          开始游戏
+    # python day15-贪吃蛇游戏02.py bench    帧耗时测试
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        benchmark_frames()
+    else:
+        game = AdvancedSnakeGame()  # 创建游戏实例
+        arcade.run()  # 运行游戏循环
\ No newline at end of file
@@ -0,0 +1,295 @@
+# 导入必要的库
+import random  # 随机数生成
+import sys  # 命令行参数
+import time  # 计时
+from collections import deque  # 双端队列（头尾增删O(1)）
+from typing import Optional, Tuple  # 类型提示支持
+
+import numpy as np  # 需安装numpy
+
+# ----------------------
+# 动作与规则
+# ----------------------
+# 动作编号（顺序同DIRECTIONS：上、下、左、右），与当前方向相反的动作会被忽略（同on_key_press）
+UP, DOWN, LEFT, RIGHT = range(4)
+MOVES = ((0, 1), (0, -1), (-1, 0), (1, 0))
+OPPOSITE = (DOWN, UP, RIGHT, LEFT)
+
+# 两套规则：
+#   classic  —— day14：撞墙结束；吃到食物的这一步不缩尾（长一节）
+#   teleport —— day15瞬移蛇：穿越边界；先按生长计数缩尾，吃到后计数+3
+# start为起点所在的比例：起点坐标 = size // start（20x20时分别为(5,5)和(10,10)，同原游戏）
+RULES = {
+    "classic": {"wrap": False, "growth": 1, "eat_first": True, "start": 4},
+    "teleport": {"wrap": True, "growth": 3, "eat_first": False, "start": 2},
+}
+MIN_SIZE = 2  # 棋盘最小边长
+
+
+def start_cell(rule: dict, size: int) -> Tuple[int, int]:
+    """按棋盘大小计算起点坐标"""
+    if size < MIN_SIZE:
+        raise ValueError(f"棋盘边长至少为{MIN_SIZE}：{size}")
+    offset = size // rule["start"]
+    return offset, offset
+
+
+Observation = Tuple[int, int, int, int, int, int]  # (头x, 头y, 食物x, 食物y, 方向, 长度)
+
+
+# ----------------------
+# 单局环境
+# ----------------------
+class SnakeEnv:
+    """无渲染的单局贪吃蛇，reset()/step(action) 接口
+
+    格子用整数下标 y*size+x 表示；每格记录蛇身节数，空闲格列表交换删除，
+    碰撞检测与生成食物都是O(1)。
+    """
+    def __init__(self, rules: str = "classic", size: int = 20, seed=None):
+        rule = RULES[rules]
+        self.rules = rules
+        self.wrap = rule["wrap"]
+        self.growth = rule["growth"]
+        self.eat_first = rule["eat_first"]
+        self.start = start_cell(rule, size)
+        self.size = size
+        self.rng = random.Random(seed)
+        self.reset()
+
+    def reset(self) -> Observation:
+        """开始新的一局，返回初始观测"""
+        cells = self.size * self.size
+        self.counts = [0] * cells  # 每格上的蛇身节数
+        self.free = list(range(cells))  # 空闲格下标
+        self.slots = list(range(cells))  # 每格在free中的位置
+        self.hx, self.hy = self.start  # 蛇头坐标
+        self.body = deque()  # 身体格下标（队尾为头部）
+        self._enter(self.hy * self.size + self.hx)
+        self.direction = RIGHT
+        self.grow_counter = 0  # 还需生长的节数
+        self.score = 0
+        self.done = False
+        self.food = self._spawn_food()
+        return self.observe()
+
+    def _enter(self, cell: int):
+        """蛇头进入格子（格子由空变满时，用free末尾元素填补空位）"""
+        if self.counts[cell] == 0:
+            slot, last = self.slots[cell], self.free[-1]
+            self.free[slot], self.slots[last] = last, slot
+            self.free.pop()
+        self.counts[cell] += 1
+        self.body.append(cell)
+
+    def _trim(self):
+        """蛇尾离开格子（格子变空时放回free末尾）"""
+        cell = self.body.popleft()
+        self.counts[cell] -= 1
+        if self.counts[cell] == 0:
+            self.slots[cell] = len(self.free)
+            self.free.append(cell)
+
+    def _spawn_food(self) -> Optional[int]:
+        """从空闲格中直接抽取（棋盘已满返回None）"""
+        return self.rng.choice(self.free) if self.free else None
+
+    def observe(self) -> Observation:
+        if self.food is None:
+            fx = fy = -1
+        else:
+            fx, fy = self.food % self.size, self.food // self.size
+        return self.hx, self.hy, fx, fy, self.direction, len(self.body)
+
+    def step(self, action: int):
+        """走一步，返回 (观测, 奖励, 是否结束)：吃到食物+1，死亡-1"""
+        if self.done:
+            raise RuntimeError("本局已结束，请先reset()")
+        if action != OPPOSITE[self.direction]:
+            self.direction = action
+        dx, dy = MOVES[self.direction]
+        x, y = self.hx + dx, self.hy + dy
+        if self.wrap:
+            x, y = x % self.size, y % self.size
+        elif not (0 <= x < self.size and 0 <= y < self.size):
+            self.done = True  # 撞墙
+            return self.observe(), -1.0, True
+
+        cell = y * self.size + x
+        self.hx, self.hy = x, y
+        self._enter(cell)
+        ate = cell == self.food
+        if ate and self.eat_first:
+            self.grow_counter += self.growth
+        if self.grow_counter > 0:
+            self.grow_counter -= 1
+        else:
+            self._trim()
+
+        reward = 0.0
+        if ate:
+            if not self.eat_first:
+                self.grow_counter += self.growth
+            self.score += 1
+            reward = 1.0
+            self.food = self._spawn_food()
+            self.done = self.food is None  # 蛇已占满棋盘
+        if self.counts[cell] > 1:  # 头部所在格还有其他身体节
+            self.done = True
+            reward = -1.0
+        return self.observe(), reward, self.done
+
+
+# ----------------------
+# 批量环境
+# ----------------------
+class BatchSnakeEnv:
+    """num_envs局同时推进的向量化环境，规则与SnakeEnv相同
+
+    每局一行“到期网格”：expiry[局, 格] 为该格蛇身离开时的缩尾计数，
+    剩余寿命 = expiry - clock，大于0即被占用。只有缩尾时clock加一，
+    所以每步只需写入新蛇头一格，不用把整张网格减一。
+    结束的局在step内自动重开，返回的done标记本步结束的局。
+    """
+    def __init__(self, num_envs: int, rules: str = "classic", size: int = 20, seed=None):
+        rule = RULES[rules]
+        self.num_envs = num_envs
+        self.rules = rules
+        self.wrap = rule["wrap"]
+        self.growth = rule["growth"]
+        self.eat_first = rule["eat_first"]
+        self.start = start_cell(rule, size)
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+
+        n = num_envs
+        self.expiry = np.zeros((n, size * size), dtype=np.int64)
+        self.clock = np.zeros(n, dtype=np.int64)  # 缩尾次数
+        self.length = np.zeros(n, dtype=np.int64)
+        self.grow_counter = np.zeros(n, dtype=np.int64)
+        self.hx = np.zeros(n, dtype=np.int64)
+        self.hy = np.zeros(n, dtype=np.int64)
+        self.direction = np.zeros(n, dtype=np.int64)
+        self.food = np.zeros(n, dtype=np.int64)  # 食物格下标，棋盘已满为-1
+        self.score = np.zeros(n, dtype=np.int64)
+        self.final_score = np.zeros(n, dtype=np.int64)  # 最近一次结束时的得分
+        self._envs = np.arange(n)
+        self._dx = np.array([dx for dx, _ in MOVES])
+        self._dy = np.array([dy for _, dy in MOVES])
+        self._opposite = np.array(OPPOSITE)
+        self.reset()
+
+    def reset(self, envs=None) -> np.ndarray:
+        """重开指定的局（默认全部），返回全部观测"""
+        envs = self._envs if envs is None else envs
+        x, y = self.start
+        self.expiry[envs] = 0
+        self.clock[envs] = 0
+        self.length[envs] = 1
+        self.expiry[envs, y * self.size + x] = 1  # 长度1，下一次缩尾时离开
+        self.grow_counter[envs] = 0
+        self.hx[envs], self.hy[envs] = x, y
+        self.direction[envs] = RIGHT
+        self.score[envs] = 0
+        self._spawn_food(envs)
+        return self.observe()
+
+    def _spawn_food(self, envs):
+        """给每局从空闲格中均匀抽取一格（随机键取最大值）"""
+        if not len(envs):
+            return
+        free = self.expiry[envs] <= self.clock[envs, None]
+        keys = np.where(free, self.rng.random(free.shape), -1.0)
+        self.food[envs] = np.where(free.any(axis=1), keys.argmax(axis=1), -1)
+
+    def observe(self) -> np.ndarray:
+        """(num_envs, 6) 数组，每行同SnakeEnv的观测"""
+        has_food = self.food >= 0
+        return np.stack(
+            [
+                self.hx,
+                self.hy,
+                np.where(has_food, self.food % self.size, -1),
+                np.where(has_food, self.food // self.size, -1),
+                self.direction,
+                self.length,
+            ],
+            axis=1,
+        )
+
+    def step(self, actions):
+        """所有局各走一步，返回 (观测, 奖励, 是否结束)"""
+        actions = np.asarray(actions)
+        turn = actions != self._opposite[self.direction]
+        self.direction = np.where(turn, actions, self.direction)
+        x = self.hx + self._dx[self.direction]
+        y = self.hy + self._dy[self.direction]
+        if self.wrap:
+            x %= self.size
+            y %= self.size
+            hit_wall = np.zeros(self.num_envs, dtype=bool)
+        else:
+            hit_wall = (x < 0) | (x >= self.size) | (y < 0) | (y >= self.size)
+        alive = ~hit_wall
+        cell = np.where(alive, y * self.size + x, 0)
+
+        ate = alive & (cell == self.food)
+        if self.eat_first:
+            self.grow_counter += ate * self.growth
+        trim = alive & (self.grow_counter == 0)
+        grow = alive & ~trim
+        self.grow_counter -= grow
+        self.length += grow
+        self.clock += trim  # 缩尾：剩余寿命为1的一节离开
+
+        bitten = alive & (self.expiry[self._envs, cell] > self.clock)
+        moved = alive & ~bitten
+        self.expiry[moved.nonzero()[0], cell[moved]] = self.clock[moved] + self.length[moved]
+        self.hx = np.where(moved, x, self.hx)
+        self.hy = np.where(moved, y, self.hy)
+        if not self.eat_first:
+            self.grow_counter += ate * self.growth
+        self.score += ate
+        self._spawn_food(np.flatnonzero(ate))
+
+        reward = ate.astype(np.float32)
+        reward[~moved] = -1.0
+        done = ~moved | (self.food < 0)
+        finished = np.flatnonzero(done)
+        if len(finished):
+            self.final_score[finished] = self.score[finished]
+            self.reset(finished)
+        return self.observe(), reward, done
+
+
+# ----------------------
+# 速度测试
+# ----------------------
+def benchmark(rules: str = "classic", steps: int = 200_000, num_envs: int = 4096, batch_steps: int = 500):
+    """随机动作下分别测试单局与批量环境的步数/秒"""
+    env = SnakeEnv(rules, seed=0)
+    actions = [random.randrange(4) for _ in range(steps)]
+    started = time.perf_counter()
+    for action in actions:
+        if env.step(action)[2]:
+            env.reset()
+    single = steps / (time.perf_counter() - started)
+
+    batch = BatchSnakeEnv(num_envs, rules, seed=0)
+    rng = np.random.default_rng(0)
+    episodes = 0
+    started = time.perf_counter()
+    for _ in range(batch_steps):
+        episodes += int(batch.step(rng.integers(0, 4, num_envs))[2].sum())
+    vector = num_envs * batch_steps / (time.perf_counter() - started)
+    print(
+        f"{rules}：单局 {single:,.0f} 步/秒，"
+        f"批量（{num_envs}局）{vector:,.0f} 步/秒，结束{episodes}局"
+    )
+
+
+# 程序入口
+if __name__ == "__main__":
+    # python 贪吃蛇训练环境.py [classic|teleport]
+    for rules in sys.argv[1:] or list(RULES):
+        benchmark(rules)
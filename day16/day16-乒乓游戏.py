@@ -1,5 +1,9 @@
 import arcade  # 导入 arcade 游戏框架
+import math  # 求解碰撞时刻用到开方
 import random  # 导入 random 模块，用于生成随机数
+import sys  # 读取命令行参数
+import time  # 统计每步逻辑耗时
+from collections import deque  # 双端队列，用于循环复用尾迹
 
 # ----------------------
 # 常量定义
@@ -7,23 +11,235 @@ import random  # 导入 random 模块，用于生成随机数
 SCREEN_WIDTH = 800  # 游戏窗口宽度
 SCREEN_HEIGHT = 600  # 游戏窗口高度
 PADDLE_COLORS = [arcade.color.BLUE, arcade.color.RED]  # 左右球拍颜色
+TRAIL_LENGTH = 5  # 尾迹保留的位置数
+TICK_RATE = 60  # 每秒逻辑步数（球每步移动 vel，与原先 60 帧/秒时的速度相同）
+MAX_SPEED_X = 40  # 水平速度上限（像素/步）；连续碰撞检测下快球也不会穿过球拍
+MAX_SPEED_Y = 8  # 竖直速度上限（像素/步）
+SPEED_UP = 1.1  # 正面击球后的加速倍数
+OFFSET_SPEED = 8  # 击中球拍边缘时的竖直速度（按击中位置偏移比例缩放）
+MAX_BOUNCES = 4  # 一步内最多处理的反弹次数
 
 
 class Vector2:
-    """二维向量类（用于表示位置和速度）"""
+    """二维向量（__slots__ 省去实例字典；可哈希，可放进集合或作字典键）
+
+    放进集合或作为字典键之后不要再原地修改。
+    """
+
+    __slots__ = ("x", "y")
 
     def __init__(self, x, y):
         self.x = x  # X 坐标或速度
         self.y = y  # Y 坐标或速度
 
+    def set(self, x, y):
+        """原地修改坐标"""
+        self.x = x
+        self.y = y
+        return self
+
     def __add__(self, other):
-        # 向量加法
         return Vector2(self.x + other.x, self.y + other.y)
 
+    def __iadd__(self, other):
+        # 原地相加，不创建新对象
+        self.x += other.x
+        self.y += other.y
+        return self
+
     def __mul__(self, scalar):
-        # 向量乘以标量
         return Vector2(self.x * scalar, self.y * scalar)
 
+    def __imul__(self, scalar):
+        self.x *= scalar
+        self.y *= scalar
+        return self
+
+    def __eq__(self, other):
+        if not isinstance(other, Vector2):
+            return NotImplemented
+        return self.x == other.x and self.y == other.y
+
+    def __hash__(self):
+        return hash((self.x, self.y))
+
+    def __repr__(self):
+        return f"Vector2({self.x}, {self.y})"
+
+
+# ----------------------
+# 连续碰撞检测（纯函数，不依赖游戏窗口）
+# ----------------------
+def sweep_circle_aabb(x, y, dx, dy, radius, cx, cy, half_w, half_h):
+    """圆心从 (x, y) 移动 (dx, dy) 的过程中，求圆与矩形首次接触的时刻
+
+    矩形中心为 (cx, cy)，半宽 half_w、半高 half_h。先把矩形各边外扩 radius，与圆心轨迹求交；
+    交点落在外扩矩形的角上时，改为与以矩形顶点为圆心、半径 radius 的圆求交。
+    返回 (t, nx, ny)：t∈[0, 1] 为接触时刻，(nx, ny) 为接触处指向球的单位法线；不接触返回 None。
+    开始时已经重叠则 t=0，法线为矩形上最近点指向球心的方向。
+    """
+    # 开始时已经重叠
+    px = min(max(x, cx - half_w), cx + half_w)
+    py = min(max(y, cy - half_h), cy + half_h)
+    ox, oy = x - px, y - py
+    dist2 = ox * ox + oy * oy
+    if dist2 < radius * radius:
+        if dist2 > 0:
+            dist = math.sqrt(dist2)
+            return 0.0, ox / dist, oy / dist
+        # 球心在矩形内：沿穿透最浅的方向推出
+        if half_w - abs(x - cx) <= half_h - abs(y - cy):
+            return 0.0, (1.0 if x >= cx else -1.0), 0.0
+        return 0.0, 0.0, (1.0 if y >= cy else -1.0)
+
+    # 与外扩矩形求交（分别求进出 x、y 两个区间的时刻）
+    t_enter, t_exit = -math.inf, math.inf
+    nx = ny = 0.0
+    for axis, p, d, c, h in ((0, x, dx, cx, half_w + radius), (1, y, dy, cy, half_h + radius)):
+        if d == 0:
+            if abs(p - c) > h:
+                return None
+            continue
+        t1, t2 = (c - h - p) / d, (c + h - p) / d
+        if t1 > t2:
+            t1, t2 = t2, t1
+        if t1 > t_enter:
+            t_enter = t1
+            nx, ny = ((-1.0 if d > 0 else 1.0), 0.0) if axis == 0 else (0.0, (-1.0 if d > 0 else 1.0))
+        t_exit = min(t_exit, t2)
+    if t_enter > t_exit or t_exit < 0 or t_enter > 1:
+        return None
+    t_enter = max(t_enter, 0.0)
+
+    # 交点在边上：直接返回；在角上：与顶点处的圆求交
+    hx, hy = x + dx * t_enter - cx, y + dy * t_enter - cy
+    if abs(hx) <= half_w or abs(hy) <= half_h:
+        return t_enter, nx, ny
+    mx = x - (cx + math.copysign(half_w, hx))
+    my = y - (cy + math.copysign(half_h, hy))
+    a = dx * dx + dy * dy
+    b = mx * dx + my * dy
+    disc = b * b - a * (mx * mx + my * my - radius * radius)
+    if a == 0 or disc < 0:
+        return None
+    t = (-b - math.sqrt(disc)) / a
+    if not 0 <= t <= 1:
+        return None
+    return t, (mx + dx * t) / radius, (my + dy * t) / radius
+
+
+def paddle_bounce(vx, vy, offset, nx, ny):
+    """球拍反弹，返回新速度
+
+    正面击中时沿用原来的手感：水平反向并加速，竖直速度由击中位置偏移决定；
+    打在球拍上下端或角上时按法线镜面反射。最后限制最大速度。
+    """
+    if ny == 0:
+        vx = -vx * SPEED_UP
+        vy = offset * OFFSET_SPEED
+    else:
+        dot = vx * nx + vy * ny
+        vx -= 2 * dot * nx
+        vy -= 2 * dot * ny
+    return (
+        max(-MAX_SPEED_X, min(MAX_SPEED_X, vx)),
+        max(-MAX_SPEED_Y, min(MAX_SPEED_Y, vy)),
+    )
+
+
+def step_ball(x, y, vx, vy, radius, paddles, height, dt=1.0):
+    """把球推进 dt 步（每步移动 (vx, vy)），途中按先后顺序处理上下墙和球拍的反弹
+
+    paddles 为 [(中心x, 中心y, 半宽, 半高), ...]。只有球正朝碰撞面运动时才反弹，
+    因此同一面不会连续反弹多次。返回 (x, y, vx, vy, 最后击中的球拍下标，没有为 -1)。
+    """
+    hit = -1
+    remaining = dt
+    for _ in range(MAX_BOUNCES):
+        dx, dy = vx * remaining, vy * remaining
+        first_t, first = math.inf, None
+
+        # 上下墙
+        if vy > 0 and y + dy > height - radius:
+            first_t, first = max(0.0, (height - radius - y) / dy), (-1, 0.0, -1.0)
+        elif vy < 0 and y + dy < radius:
+            first_t, first = max(0.0, (radius - y) / dy), (-1, 0.0, 1.0)
+
+        # 球拍
+        for i, (cx, cy, half_w, half_h) in enumerate(paddles):
+            contact = sweep_circle_aabb(x, y, dx, dy, radius, cx, cy, half_w, half_h)
+            if contact is None or contact[0] >= first_t:
+                continue
+            t, nx, ny = contact
+            if vx * nx + vy * ny < 0:  # 只在朝球拍运动时反弹
+                first_t, first = t, (i, nx, ny)
+
+        if first is None:
+            return x + dx, y + dy, vx, vy, hit
+
+        x += dx * first_t
+        y += dy * first_t
+        remaining *= 1 - first_t
+        index, nx, ny = first
+        if index < 0:
+            vy = -vy  # 上下墙反弹
+        else:
+            cx, cy, half_w, half_h = paddles[index]
+            vx, vy = paddle_bounce(vx, vy, (y - cy) / half_h, nx, ny)
+            hit = index
+    return x, y, vx, vy, hit
+
+
+class FixedTimestep:
+    """固定步长调度器：累积帧时间，按固定步长推进逻辑，不足一步的余数留到下一帧
+
+    一帧最多补 max_catch_up 步，再多的时间直接丢弃，避免卡顿后越追越慢；
+    alpha 为余下时间占一步的比例，绘制时用于在上一步和当前状态之间插值。
+    """
+
+    def __init__(self, step, max_catch_up=5):
+        self.step = step  # 每步时长（秒）
+        self.max_catch_up = max_catch_up  # 每帧最多执行的步数
+        self.accumulator = 0.0  # 尚未模拟的时间
+        self.ticks = 0  # 已执行的步数
+        self.dropped_time = 0.0  # 因追赶上限丢弃的时间
+        self.tick_time_total = 0.0  # 所有步的逻辑耗时之和
+        self.tick_time_max = 0.0  # 单步逻辑耗时最大值
+
+    def advance(self, delta_time, tick):
+        """累积 delta_time 并执行到期的步，返回本帧执行的步数"""
+        self.accumulator += delta_time
+        steps = 0
+        while self.accumulator >= self.step:
+            if steps == self.max_catch_up:
+                remainder = self.accumulator % self.step
+                self.dropped_time += self.accumulator - remainder
+                self.accumulator = remainder
+                break
+            started = time.perf_counter()
+            tick()
+            elapsed = time.perf_counter() - started
+            self.tick_time_total += elapsed
+            self.tick_time_max = max(self.tick_time_max, elapsed)
+            self.ticks += 1
+            self.accumulator -= self.step
+            steps += 1
+        return steps
+
+    @property
+    def alpha(self):
+        """插值系数（0~1）"""
+        return self.accumulator / self.step
+
+    def metrics(self):
+        """每步逻辑耗时等统计"""
+        return {
+            "ticks": self.ticks,
+            "mean_tick_ms": self.tick_time_total / self.ticks * 1000 if self.ticks else 0.0,
+            "max_tick_ms": self.tick_time_max * 1000,
+            "dropped_seconds": self.dropped_time,
+        }
+
 
 class Paddle:
     """球拍类"""
@@ -37,6 +253,10 @@ class Paddle:
         # 初始化球拍位置（左边在 x=50，右边在 x=750）
         self.pos = Vector2(50 if side == "left" else 750, 300)
 
+    def rect(self):
+        """碰撞矩形 (中心x, 中心y, 半宽, 半高)"""
+        return self.pos.x, self.pos.y, self.width / 2, self.height / 2
+
 
 class Ball:
     """球类"""
@@ -44,13 +264,22 @@ class Ball:
     def __init__(self):
         self.radius = 10  # 球的半径
         self.reset()  # 初始化位置和速度
-        self.trail = []  # 用于记录球的移动轨迹，产生尾迹效果
+        self.trail = deque()  # 用于记录球的移动轨迹，产生尾迹效果
 
     def reset(self):
         """重置球的位置和速度"""
         self.pos = Vector2(400, 300)  # 回到中心
+        self.prev_pos = Vector2(400, 300)  # 上一步的位置（用于插值绘制）
         self.vel = Vector2(5, random.choice([-4, 4]))  # 设置初始速度
 
+    def record_trail(self):
+        """记录当前位置到尾迹（只保留最近 TRAIL_LENGTH 个，满了以后复用最旧的向量）"""
+        if len(self.trail) < TRAIL_LENGTH:
+            point = Vector2(0, 0)
+        else:
+            point = self.trail.popleft()
+        self.trail.append(point.set(self.pos.x, self.pos.y))
+
 
 # ----------------------
 # 游戏主类
@@ -63,6 +292,7 @@ class PongGame(arcade.Window):
         self.right_paddle = Paddle("right")  # 创建右球拍
         self.ball = Ball()  # 创建球对象
         self.game_active = False  # 游戏是否处于进行中状态
+        self.timestep = FixedTimestep(1 / TICK_RATE)  # 固定步长调度，与帧率无关
 
         self.keys_pressed = set()  # 保存当前按下的按键
         arcade.set_background_color(arcade.color.DARK_GREEN)  # 设置背景色
@@ -91,9 +321,14 @@ class PongGame(arcade.Window):
                 pos.x, pos.y, self.ball.radius, (255, 255, 255, int(alpha))
             )
 
-        # 绘制球体
+        # 绘制球体（在上一步和当前位置之间插值）
+        alpha = self.timestep.alpha
+        prev, pos = self.ball.prev_pos, self.ball.pos
         arcade.draw_circle_filled(
-            self.ball.pos.x, self.ball.pos.y, self.ball.radius, arcade.color.WHITE
+            prev.x + (pos.x - prev.x) * alpha,
+            prev.y + (pos.y - prev.y) * alpha,
+            self.ball.radius,
+            arcade.color.WHITE,
         )
 
         # 显示比分
@@ -125,17 +360,21 @@ class PongGame(arcade.Window):
         if not self.game_active:
             return  # 如果游戏未开始，则不更新
 
+        self.timestep.advance(delta_time, self._tick)  # 按固定步长推进（可能补走几步）
+
+    def _tick(self):
+        """游戏逻辑走一步"""
+        if not self.game_active:
+            return  # 同一帧内补走时，可能已经得分暂停
+
         self._move_paddles()  # 处理球拍移动
 
-        self.ball.pos += self.ball.vel  # 更新球的位置
+        self.ball.prev_pos.set(self.ball.pos.x, self.ball.pos.y)
+        self._move_ball()  # 移动球，途中处理上下墙和球拍的反弹
 
         # 更新尾迹（只保留最近 5 个位置）
-        self.ball.trail.append(Vector2(self.ball.pos.x, self.ball.pos.y))
-        if len(self.ball.trail) > 5:
-            self.ball.trail.pop(0)
+        self.ball.record_trail()
 
-        self._check_wall_collision()  # 检查上下边界碰撞
-        self._check_paddle_collision()  # 检查与球拍碰撞
         self._check_score()  # 检查是否得分
 
     def _move_paddles(self):
@@ -165,32 +404,20 @@ class PongGame(arcade.Window):
                 self.right_paddle.pos.y - self.right_paddle.speed,
             )
 
-    def _check_wall_collision(self):
-        """检测上下边界碰撞，撞到后反弹"""
-        if (
-            self.ball.pos.y < self.ball.radius
-            or self.ball.pos.y > SCREEN_HEIGHT - self.ball.radius
-        ):
-            self.ball.vel.y *= -1  # Y方向反弹
-
-    def _check_paddle_collision(self):
-        """检测球与球拍是否碰撞"""
-        for paddle in [self.left_paddle, self.right_paddle]:
-            if abs(self.ball.pos.x - paddle.pos.x) < (
-                paddle.width / 2 + self.ball.radius
-            ) and abs(self.ball.pos.y - paddle.pos.y) < (
-                paddle.height / 2 + self.ball.radius
-            ):
-                # 计算偏移量（用来控制弹射方向）
-                offset = (self.ball.pos.y - paddle.pos.y) / (paddle.height / 2)
-                self.ball.vel.x *= -1.1  # 反弹并加速
-                self.ball.vel.y = offset * 8  # 根据偏移决定Y速度
-
-                # 限制最大速度
-                self.ball.vel = Vector2(
-                    max(-10, min(10, self.ball.vel.x)),
-                    max(-8, min(8, self.ball.vel.y)),
-                )
+    def _move_ball(self):
+        """连续碰撞检测：求出一步之内与墙、球拍的准确接触时刻，快球也不会穿过球拍"""
+        ball = self.ball
+        x, y, vx, vy, _ = step_ball(
+            ball.pos.x,
+            ball.pos.y,
+            ball.vel.x,
+            ball.vel.y,
+            ball.radius,
+            [self.left_paddle.rect(), self.right_paddle.rect()],
+            SCREEN_HEIGHT,
+        )
+        ball.pos.set(x, y)
+        ball.vel.set(vx, vy)
 
     def _check_score(self):
         """检查球是否飞出边界，判断得分"""
@@ -216,7 +443,93 @@ class PongGame(arcade.Window):
             self.keys_pressed.remove(key)  # 松开按键时从集合中移除
 
 
+# ----------------------
+# 压力测试
+# ----------------------
+def _box_distance(x, y, cx, cy, half_w, half_h):
+    """点到矩形的距离"""
+    ox = max(abs(x - cx) - half_w, 0.0)
+    oy = max(abs(y - cy) - half_h, 0.0)
+    return math.hypot(ox, oy)
+
+
+def _segment_box_distance(x, y, dx, dy, cx, cy, half_w, half_h):
+    """线段到矩形的最近距离（距离沿线段是凸函数，用三分法求最小值，与扫掠求交相互独立）"""
+    lo, hi = 0.0, 1.0
+    for _ in range(50):
+        m1, m2 = lo + (hi - lo) / 3, hi - (hi - lo) / 3
+        d1 = _box_distance(x + dx * m1, y + dy * m1, cx, cy, half_w, half_h)
+        d2 = _box_distance(x + dx * m2, y + dy * m2, cx, cy, half_w, half_h)
+        if d1 <= d2:
+            hi = m2
+        else:
+            lo = m1
+    t = (lo + hi) / 2
+    return _box_distance(x + dx * t, y + dy * t, cx, cy, half_w, half_h)
+
+
+def stress_test(shots=1_000_000, seed=0):
+    """随机发射 shots 个球（速度最高为上限的两倍），逐一核对：
+
+    1. 轨迹碰到球拍的一定被检测到，碰不到的不会误判（不穿透）；
+    2. 一步结束后球不与球拍重叠；
+    3. 靠近上下墙的球只反弹一次，结束时仍在场内且朝场内运动。
+    同时统计原先“只看一步结束位置”的离散检测会漏掉多少次。
+    """
+    rng = random.Random(seed)
+    radius, eps = 10, 1e-6
+    paddle = (750, 300, 7.5, 40)
+    tunnels = false_hits = overlaps = wall_errors = hits = discrete_misses = 0
+    started = time.perf_counter()
+    for _ in range(shots):
+        # 从球拍附近随机位置瞄准球拍一带发射
+        while True:
+            x, y = rng.uniform(650, 850), rng.uniform(150, 450)
+            if _box_distance(x, y, *paddle) > radius + eps:
+                break
+        tx, ty = rng.uniform(700, 800), rng.uniform(200, 400)
+        speed = rng.uniform(1, 2 * MAX_SPEED_X)
+        length = math.hypot(tx - x, ty - y) or 1.0
+        vx, vy = (tx - x) / length * speed, (ty - y) / length * speed
+
+        end_x, end_y, _, _, hit = step_ball(x, y, vx, vy, radius, [paddle], SCREEN_HEIGHT)
+        gap = _segment_box_distance(x, y, vx, vy, *paddle)
+        if hit == 0:
+            hits += 1
+            if gap > radius + eps:
+                false_hits += 1
+            if _box_distance(x + vx, y + vy, *paddle) >= radius:
+                discrete_misses += 1
+        elif gap < radius - eps:
+            tunnels += 1
+        if _box_distance(end_x, end_y, *paddle) < radius - eps:
+            overlaps += 1
+
+        # 上下墙：任意位置、任意竖直速度
+        wy, wvy = rng.uniform(radius, SCREEN_HEIGHT - radius), rng.uniform(-80, 80)
+        _, end_y, _, end_vy, _ = step_ball(400, wy, 0, wvy, radius, [], SCREEN_HEIGHT)
+        inside = radius - eps <= end_y <= SCREEN_HEIGHT - radius + eps
+        heading_in = not (end_y > SCREEN_HEIGHT - radius - eps and end_vy > 0) and not (
+            end_y < radius + eps and end_vy < 0
+        )
+        if not (inside and heading_in):
+            wall_errors += 1
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"{shots}次发射，击中球拍{hits}次，用时{elapsed:.1f}秒：穿透{tunnels}次，误判{false_hits}次，"
+        f"结束时重叠{overlaps}次，墙面反弹错误{wall_errors}次；"
+        f"离散检测会漏掉其中{discrete_misses}次"
+    )
+    return tunnels + false_hits + overlaps + wall_errors == 0
+
+
 # 程序入口
 if __name__ == "__main__":
-    game = PongGame()  # 创建游戏窗口
-    arcade.run()  # 启动游戏主循环
+    # python day16-乒乓游戏.py           开始游戏
+    # python day16-乒乓游戏.py stress    10^6 次随机发射的碰撞压力测试
+    if len(sys.argv) > 1 and sys.argv[1] == "stress":
+        stress_test()
+    else:
+        game = PongGame()  # 创建游戏窗口
+        arcade.run()  # 启动游戏主循环